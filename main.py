@@ -71,13 +71,27 @@ class MigrationOrchestrator:
         """Explore project structure with user confirmation"""
         self.logger.log_step("Project Exploration", {"status": "started"})
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"http://{MCP_SERVERS['file_explorer']['host']}:{MCP_SERVERS['file_explorer']['port']}/explore",
-                json={"path": project_path, "file_types": ["pom.xml", "java"]}
-            )
-            result = response.json()
-            
+        result = {"files": [], "directories": [], "file_types": {}}
+
+        # Consume the NDJSON stream as the explorer walks instead of waiting for one big body
+        async with httpx.AsyncClient(timeout=None) as client:
+            async with client.stream(
+                "POST",
+                f"http://{MCP_SERVERS['file_explorer']['host']}:{MCP_SERVERS['file_explorer']['port']}/explore/stream",
+                json={"path": project_path, "file_types": ["pom.xml", "java"], "use_index": True, "use_git": True}
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    entry = json.loads(line)
+                    if entry["kind"] == "file":
+                        result["files"].append({"path": entry["path"], "type": entry["type"]})
+                    elif entry["kind"] == "directory":
+                        result["directories"].append(entry["path"])
+                    elif entry["kind"] == "summary":
+                        result["file_types"] = entry["file_types"]
+
             self.logger.log_step("Project Structure", {
                 "files_found": len(result.get("files", [])),
                 "directories": result.get("directories", []),
@@ -97,7 +111,7 @@ class MigrationOrchestrator:
         
         async with httpx.AsyncClient() as client:
             response = await client.post(
-                f"http://{MCP_SERVERS['file_parser']['host']}:{MCP_SERVERS['file_parser']['port']}/parse/pom",
+                f"http://{MCP_SERVERS['file_parser']['host']}:{MCP_SERVERS['file_parser']['port']}/parse/pom/effective",
                 json={"file_path": pom_path, "file_type": "pom"}
             )
             result = response.json()
@@ -120,6 +134,24 @@ class MigrationOrchestrator:
             
             return result
     
+    async def analyze_reactor(self, project_path: str) -> Dict:
+        """Build the multi-module reactor graph for the project"""
+        self.logger.log_step("Reactor Analysis", {"status": "started"})
+        
+        async with httpx.AsyncClient(timeout=None) as client:
+            response = await client.post(
+                f"http://{MCP_SERVERS['file_parser']['host']}:{MCP_SERVERS['file_parser']['port']}/reactor",
+                json={"project_path": project_path}
+            )
+            result = response.json()
+            
+            self.logger.log_step("Reactor Graph", {
+                "modules": [module["path"] for module in result.get("modules", [])],
+                "levels": result.get("levels", [])
+            })
+            
+            return result
+    
     async def verify_spring_boot(self, project_path: str) -> Dict:
         """Verify Spring Boot version with user confirmation"""
         self.logger.log_step("Spring Boot Verification", {"status": "started"})
@@ -151,99 +183,165 @@ class MigrationOrchestrator:
             
             return result
     
-    async def compile_project(self, project_path: str) -> Dict:
-        """Compile project with user confirmation"""
-        self.logger.log_step("Project Compilation", {"status": "started"})
+    async def stream_maven(self, endpoint: str, payload: Dict) -> Dict:
+        """Run a Maven step through its streaming endpoint, echoing the build log as it arrives"""
+        result = {}
+        async with httpx.AsyncClient(timeout=None) as client:
+            async with client.stream(
+                "POST",
+                f"http://{MCP_SERVERS['maven']['host']}:{MCP_SERVERS['maven']['port']}/{endpoint}",
+                json=payload
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event["event"] == "output":
+                        print(event["line"])
+                    elif event["event"] == "result":
+                        result = event["result"]
+        return result
+    
+    async def prefetch_dependencies(self, project_path: str) -> Dict:
+        """Warm the shared local repository so later Maven runs that skip tests can go offline"""
+        self.logger.log_step("Dependency Prefetch", {"status": "started"})
         
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(timeout=None) as client:
             response = await client.post(
-                f"http://{MCP_SERVERS['maven']['host']}:{MCP_SERVERS['maven']['port']}/compile",
-                json={"project_path": project_path, "goals": ["compile"]}
+                f"http://{MCP_SERVERS['maven']['host']}:{MCP_SERVERS['maven']['port']}/dependencies/prefetch",
+                json={"project_paths": [project_path]}
             )
             result = response.json()
+            if response.status_code != 200:
+                # No mirror configured or unreadable POMs; builds resolve dependencies themselves
+                result = {"success": False, "message": result.get("detail")}
             
-            reasoning = await self.get_llm_reasoning({
-                "step": "Project Compilation",
-                "result": result
-            })
-            
-            self.logger.log_step("Compilation Results", {
+            self.logger.log_step("Prefetch Results", {
                 "success": result.get("success"),
-                "output": result.get("output"),
-                "errors": result.get("errors"),
-                "reasoning": reasoning
+                "message": result.get("message"),
+                "copied_files": result.get("copied_files"),
+                "missing": result.get("missing"),
+                "unresolved": result.get("unresolved")
             })
             
-            if not result.get("success"):
-                await self.prompt_user(
-                    f"Compilation failed. Reasoning:\n{reasoning}\n\nWould you like to continue anyway?",
-                    ["Yes", "No"]
-                )
-            
             return result
     
+    async def compile_project(self, project_path: str) -> Dict:
+        """Compile project with user confirmation"""
+        self.logger.log_step("Project Compilation", {"status": "started"})
+        
+        result = await self.stream_maven("compile/stream", {"project_path": project_path, "goals": ["compile"]})
+        
+        reasoning = await self.get_llm_reasoning({
+            "step": "Project Compilation",
+            "result": result
+        })
+        
+        self.logger.log_step("Compilation Results", {
+            "success": result.get("success"),
+            "output": result.get("output"),
+            "errors": result.get("errors"),
+            "reasoning": reasoning
+        })
+        
+        if not result.get("success"):
+            await self.prompt_user(
+                f"Compilation failed. Reasoning:\n{reasoning}\n\nWould you like to continue anyway?",
+                ["Yes", "No"]
+            )
+        
+        return result
+    
     async def run_tests(self, project_path: str) -> Dict:
         """Run tests with user confirmation"""
         self.logger.log_step("Test Execution", {"status": "started"})
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"http://{MCP_SERVERS['maven']['host']}:{MCP_SERVERS['maven']['port']}/test",
-                json={"project_path": project_path, "goals": ["test"]}
+        result = await self.stream_maven("test/stream", {"project_path": project_path, "goals": ["test"]})
+        
+        reasoning = await self.get_llm_reasoning({
+            "step": "Test Execution",
+            "result": result
+        })
+        
+        self.logger.log_step("Test Results", {
+            "success": result.get("success"),
+            "test_results": result.get("test_results"),
+            "errors": result.get("errors"),
+            "reasoning": reasoning
+        })
+        
+        if not result.get("success"):
+            await self.prompt_user(
+                f"Tests failed. Reasoning:\n{reasoning}\n\nWould you like to continue anyway?",
+                ["Yes", "No"]
             )
-            result = response.json()
-            
-            reasoning = await self.get_llm_reasoning({
-                "step": "Test Execution",
-                "result": result
-            })
-            
-            self.logger.log_step("Test Results", {
-                "success": result.get("success"),
-                "test_results": result.get("test_results"),
-                "errors": result.get("errors"),
-                "reasoning": reasoning
-            })
-            
-            if not result.get("success"):
-                await self.prompt_user(
-                    f"Tests failed. Reasoning:\n{reasoning}\n\nWould you like to continue anyway?",
-                    ["Yes", "No"]
-                )
-            
-            return result
+        
+        return result
     
     async def build_project(self, project_path: str, skip_tests: bool = False) -> Dict:
         """Build project with user confirmation"""
         self.logger.log_step("Project Build", {"status": "started", "skip_tests": skip_tests})
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"http://{MCP_SERVERS['maven']['host']}:{MCP_SERVERS['maven']['port']}/build",
-                json={"project_path": project_path, "goals": ["clean", "install"], "skip_tests": skip_tests}
+        result = await self.stream_maven("build/stream", {"project_path": project_path, "goals": ["clean", "install"], "skip_tests": skip_tests})
+        
+        reasoning = await self.get_llm_reasoning({
+            "step": "Project Build",
+            "result": result
+        })
+        
+        self.logger.log_step("Build Results", {
+            "success": result.get("success"),
+            "output": result.get("output"),
+            "errors": result.get("errors"),
+            "build_artifacts": result.get("build_artifacts"),
+            "reasoning": reasoning
+        })
+        
+        if not result.get("success"):
+            await self.prompt_user(
+                f"Build failed. Reasoning:\n{reasoning}\n\nWould you like to retry?",
+                ["Yes", "No"]
             )
-            result = response.json()
-            
-            reasoning = await self.get_llm_reasoning({
-                "step": "Project Build",
-                "result": result
-            })
-            
-            self.logger.log_step("Build Results", {
-                "success": result.get("success"),
-                "output": result.get("output"),
-                "errors": result.get("errors"),
-                "build_artifacts": result.get("build_artifacts"),
-                "reasoning": reasoning
-            })
-            
-            if not result.get("success"):
-                await self.prompt_user(
-                    f"Build failed. Reasoning:\n{reasoning}\n\nWould you like to retry?",
-                    ["Yes", "No"]
-                )
-            
-            return result
+        
+        return result
+    
+    async def verify_project(self, project_path: str) -> Dict:
+        """Compile, test and build in one Maven run with user confirmation"""
+        self.logger.log_step("Project Verification", {"status": "started"})
+        
+        result = await self.stream_maven("pipeline/stream", {"project_path": project_path, "phase": "install"})
+        
+        reasoning = await self.get_llm_reasoning({
+            "step": "Project Verification",
+            "result": result
+        })
+        
+        self.logger.log_step("Compilation Results", {
+            "success": (result.get("compile") or {}).get("success"),
+            "output": (result.get("compile") or {}).get("output"),
+            "errors": (result.get("compile") or {}).get("errors")
+        })
+        self.logger.log_step("Test Results", {
+            "success": (result.get("test") or {}).get("success"),
+            "test_results": (result.get("test") or {}).get("test_results"),
+            "errors": (result.get("test") or {}).get("errors")
+        })
+        self.logger.log_step("Build Results", {
+            "success": (result.get("build") or {}).get("success"),
+            "output": (result.get("build") or {}).get("output"),
+            "errors": (result.get("build") or {}).get("errors"),
+            "build_artifacts": (result.get("build") or {}).get("build_artifacts"),
+            "reasoning": reasoning
+        })
+        
+        if not result.get("success"):
+            await self.prompt_user(
+                f"Verification failed. Reasoning:\n{reasoning}\n\nWould you like to continue anyway?",
+                ["Yes", "No"]
+            )
+        
+        return result
     
     async def get_migration_strategy(self, analysis: Dict) -> Dict:
         prompt = f"""
@@ -285,6 +383,24 @@ class MigrationOrchestrator:
         
         return None, None
     
+    async def snapshot_project(self, project_path: str, baseline_id: Optional[str] = None) -> Dict:
+        """Record content hashes of the project sources, reusing unchanged entries from a baseline"""
+        async with httpx.AsyncClient(timeout=None) as client:
+            response = await client.post(
+                f"http://{MCP_SERVERS['file_explorer']['host']}:{MCP_SERVERS['file_explorer']['port']}/manifest",
+                json={"path": project_path, "use_git": True, "baseline_id": baseline_id}
+            )
+            return response.json()
+    
+    async def diff_snapshots(self, base_id: str, head_id: str) -> Dict:
+        """Get the files added, removed and modified between two snapshots"""
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"http://{MCP_SERVERS['file_explorer']['host']}:{MCP_SERVERS['file_explorer']['port']}/manifest/diff",
+                json={"base_id": base_id, "head_id": head_id}
+            )
+            return response.json()
+    
     async def analyze_with_migration_tool(self, project_path: str, tool: str, source_version: str, target_version: str) -> Dict:
         async with httpx.AsyncClient() as client:
             response = await client.post(
@@ -330,11 +446,17 @@ class MigrationOrchestrator:
             if not pom_files:
                 raise Exception("No POM files found in the project")
             
-            pom_analysis = await self.analyze_pom(pom_files[0]["path"])
+            # Log the module graph, then analyze the reactor root rather than whichever POM the walk found first
+            await self.analyze_reactor(project_path)
+            root_pom = os.path.join(project_path, "pom.xml")
+            pom_analysis = await self.analyze_pom(root_pom if os.path.exists(root_pom) else pom_files[0]["path"])
             
             # Step 3: Verify Spring Boot
             spring_boot_info = await self.verify_spring_boot(project_path)
             
+            # Warm the shared repository so the Maven steps below resolve from it, offline where no tests run
+            await self.prefetch_dependencies(project_path)
+            
             # Step 4: Initial compilation
             compile_result = await self.compile_project(project_path)
             
@@ -363,6 +485,7 @@ class MigrationOrchestrator:
                 )
                 
                 # Step 7: Execute migration
+                pre_snapshot = await self.snapshot_project(project_path)
                 migration_result = await self.execute_migration(
                     project_path,
                     {"target_version": migration_target["target"]},
@@ -370,10 +493,26 @@ class MigrationOrchestrator:
                     migration_target["recipe"]
                 )
                 
-                # Step 8: Post-migration verification
-                post_compile = await self.compile_project(project_path)
-                post_tests = await self.run_tests(project_path)
-                final_build = await self.build_project(project_path)
+                # Report the files the migration actually changed
+                post_snapshot = await self.snapshot_project(project_path, pre_snapshot["manifest_id"])
+                changes = await self.diff_snapshots(pre_snapshot["manifest_id"], post_snapshot["manifest_id"])
+                migration_result["changes"] = (
+                    [{"file": path, "type": "added"} for path in changes["added"]] +
+                    [{"file": path, "type": "updated"} for path in changes["modified"]] +
+                    [{"file": path, "type": "removed"} for path in changes["removed"]]
+                )
+                
+                self.logger.log_step("Migration Changes", {
+                    "success": migration_result.get("success"),
+                    "changes": migration_result["changes"],
+                    "unchanged_files": changes["unchanged"]
+                })
+                
+                # The migration may have bumped dependency versions
+                await self.prefetch_dependencies(project_path)
+                
+                # Step 8: Post-migration verification in a single clean install
+                verification = await self.verify_project(project_path)
                 
                 # Generate final report
                 report_path = self.logger.generate_html_report()
@@ -1,44 +1,737 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import os
-from typing import List, Dict
+import json
+import asyncio
+import hashlib
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Iterator, Optional, Tuple
 
 app = FastAPI(title="File Explorer MCP")
 
+# Directories that never contain migration sources and are expensive to walk
+DEFAULT_EXCLUDE_DIRS = ["target", ".git", "node_modules", "migration_logs"]
+
+# Where persistent file indexes are stored between server runs
+INDEX_DIR = os.getenv("FILE_INDEX_DIR", os.path.expanduser("~/.cache/migration-assistant/file-index"))
+INDEX_FORMAT_VERSION = 1
+
+# Upper bound on directory walks running at once across all batch requests
+EXPLORE_WORKERS = int(os.getenv("EXPLORE_WORKERS", "16"))
+_explore_executor = ThreadPoolExecutor(max_workers=EXPLORE_WORKERS, thread_name_prefix="explore")
+
+# Content-hash manifests used to detect what a migration changed
+MANIFEST_DIR = os.getenv("MANIFEST_DIR", os.path.expanduser("~/.cache/migration-assistant/manifests"))
+MANIFEST_RETENTION = 100
+HASH_CHUNK_SIZE = 1024 * 1024
+
 class FileExplorerRequest(BaseModel):
     path: str
     file_types: List[str] = ["pom.xml", "java"]
+    exclude_dirs: List[str] = DEFAULT_EXCLUDE_DIRS
+    use_index: bool = False
+    use_git: bool = False
 
 class FileExplorerResponse(BaseModel):
     files: List[Dict[str, str]]
     directories: List[str]
+    file_types: Dict[str, int] = {}
+
+class CompactExplorerRequest(FileExplorerRequest):
+    counts_only: bool = False
+
+class CompactExplorerResponse(BaseModel):
+    """Interned path table: every directory is (parent index, name) with the root at index 0
+    and every file is (directory index, name, index into types)"""
+    root: str
+    directories: List[Tuple[int, str]] = []
+    types: List[str] = []
+    files: List[Tuple[int, str, int]] = []
+    file_count: int
+    directory_count: int
+    file_types: Dict[str, int]
+
+class BatchExplorerRequest(BaseModel):
+    paths: List[str]
+    file_types: List[str] = ["pom.xml", "java"]
+    exclude_dirs: List[str] = DEFAULT_EXCLUDE_DIRS
+    use_index: bool = False
+    use_git: bool = False
+    compact: bool = False
+    max_workers: int = 8
+
+class ManifestRequest(FileExplorerRequest):
+    # None hashes every file that survives directory pruning
+    file_types: Optional[List[str]] = None
+    baseline_id: Optional[str] = None
+    max_workers: int = 8
+
+class ManifestResponse(BaseModel):
+    manifest_id: str
+    root: str
+    file_count: int
+    hashed: int
+    reused: int
+
+class ManifestDiffRequest(BaseModel):
+    base_id: str
+    head_id: str
+
+class ManifestDiff(BaseModel):
+    added: List[str]
+    removed: List[str]
+    modified: List[str]
+    unchanged: int
+
+class IndexWatchRequest(BaseModel):
+    path: str
+    exclude_dirs: List[str] = DEFAULT_EXCLUDE_DIRS
+    interval: float = 2.0
+
+class IndexDelta(BaseModel):
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+    rescanned_directories: int
+    total_files: int
+
+def matches_file_types(filename: str, file_types: Optional[List[str]]) -> bool:
+    """Check a file name against the requested suffixes (None matches everything)"""
+    if file_types is None:
+        return True
+    return any(filename.endswith(ft) for ft in file_types)
+
+def walk_directory(root: str, file_types: Optional[List[str]], exclude_dirs: List[str]) -> Iterator[Dict[str, str]]:
+    """Walk a directory tree with os.scandir, pruning excluded directories
+
+    Yields one record per matching file ({"kind": "file", "path", "type"})
+    and per visited directory ({"kind": "directory", "path"}) as soon as it
+    is seen, so callers never need to hold the whole tree in memory.
+    """
+    excluded = set(exclude_dirs)
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                subdirs = []
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if entry.name not in excluded:
+                            subdirs.append(entry.path)
+                    elif matches_file_types(entry.name, file_types):
+                        yield {"kind": "file", "path": entry.path, "type": entry.name.split(".")[-1]}
+        except OSError:
+            # Unreadable directories are skipped, like os.walk does by default
+            continue
+        for subdir in subdirs:
+            yield {"kind": "directory", "path": subdir}
+        # Reverse so directories are visited in scandir order
+        stack.extend(reversed(subdirs))
+
+class FileIndex:
+    """Persistent index of a directory tree that re-scans only directories whose mtime changed
+
+    Each indexed directory stores its own mtime, its subdirectory names and
+    the size and mtime of every file in it. Creating, deleting or renaming an
+    entry bumps the parent directory's mtime, so a refresh only has to stat
+    every directory and re-list the few that changed. An in-place edit does
+    not touch the directory, so file sizes and mtimes in unchanged
+    directories are only re-checked when a refresh asks for stat_files.
+    """
+
+    def __init__(self, root: str, exclude_dirs: List[str]):
+        self.root = os.path.abspath(root)
+        self.exclude_dirs = sorted(set(exclude_dirs))
+        key = hashlib.sha1(json.dumps([self.root, self.exclude_dirs]).encode()).hexdigest()
+        self.index_path = os.path.join(INDEX_DIR, f"{key}.json")
+        # Relative directory path -> {"mtime": int, "dirs": [names], "files": {name: [size, mtime]}}
+        self.directories: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        self.watcher: Optional["IndexWatcher"] = None
+        self.load()
+
+    def load(self):
+        """Load the index from disk, ignoring missing or incompatible files"""
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_FORMAT_VERSION and data.get("root") == self.root:
+            self.directories = data.get("directories", {})
+
+    def save(self):
+        """Atomically write the index to disk"""
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                "version": INDEX_FORMAT_VERSION,
+                "root": self.root,
+                "directories": self.directories
+            }, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _scan_directory(self, path: str, mtime: int) -> Optional[Dict]:
+        excluded = set(self.exclude_dirs)
+        dirs = []
+        files = {}
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in excluded:
+                                dirs.append(entry.name)
+                        else:
+                            stat = entry.stat(follow_symlinks=False)
+                            files[entry.name] = [stat.st_size, stat.st_mtime_ns]
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return {"mtime": mtime, "dirs": dirs, "files": files}
+
+    def refresh(self, stat_files: bool = False) -> IndexDelta:
+        """Bring the index up to date and report which files were added, removed or changed
+
+        Without stat_files, changed only covers files in re-listed directories.
+        """
+        with self.lock:
+            added = []
+            removed = []
+            changed = []
+            rescanned = 0
+            restatted = False
+            seen = set()
+            stack = [""]
+            while stack:
+                rel = stack.pop()
+                path = os.path.join(self.root, rel) if rel else self.root
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(rel)
+                cached = self.directories.get(rel)
+                if cached is None or cached["mtime"] != mtime:
+                    entry = self._scan_directory(path, mtime)
+                    if entry is None:
+                        seen.discard(rel)
+                        continue
+                    old_files = cached["files"] if cached else {}
+                    for name, info in entry["files"].items():
+                        if name not in old_files:
+                            added.append(os.path.join(rel, name))
+                        elif old_files[name] != info:
+                            changed.append(os.path.join(rel, name))
+                    removed.extend(os.path.join(rel, name) for name in old_files if name not in entry["files"])
+                    self.directories[rel] = entry
+                    rescanned += 1
+                else:
+                    entry = cached
+                    if stat_files:
+                        for name, info in entry["files"].items():
+                            try:
+                                stat = os.stat(os.path.join(path, name), follow_symlinks=False)
+                            except OSError:
+                                continue
+                            if [stat.st_size, stat.st_mtime_ns] != info:
+                                entry["files"][name] = [stat.st_size, stat.st_mtime_ns]
+                                changed.append(os.path.join(rel, name))
+                                restatted = True
+                stack.extend(os.path.join(rel, d) for d in reversed(entry["dirs"]))
+
+            for rel in [d for d in self.directories if d not in seen]:
+                removed.extend(os.path.join(rel, name) for name in self.directories.pop(rel)["files"])
+
+            if rescanned or removed or restatted:
+                self.save()
+
+            return IndexDelta(
+                added=added,
+                removed=removed,
+                changed=changed,
+                rescanned_directories=rescanned,
+                total_files=sum(len(d["files"]) for d in self.directories.values())
+            )
+
+    def iter_entries(self, file_types: Optional[List[str]], base: Optional[str] = None) -> Iterator[Dict[str, str]]:
+        """Yield the same records as walk_directory, served from the index
+
+        Paths are joined onto base (defaults to the absolute root) so they
+        match what a plain walk of the requested path would produce.
+        """
+        base_path = base or self.root
+        with self.lock:
+            directories = dict(self.directories)
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            entry = directories.get(rel)
+            if entry is None:
+                continue
+            directory = os.path.join(base_path, rel) if rel else base_path
+            for name in entry["files"]:
+                if matches_file_types(name, file_types):
+                    yield {"kind": "file", "path": os.path.join(directory, name), "type": name.split(".")[-1]}
+            subdirs = [os.path.join(rel, d) for d in entry["dirs"]]
+            for subdir in subdirs:
+                yield {"kind": "directory", "path": os.path.join(base_path, subdir)}
+            stack.extend(reversed(subdirs))
+
+class IndexWatcher(threading.Thread):
+    """Background thread that keeps a FileIndex hot by refreshing it periodically
+
+    Polls directory mtimes rather than relying on platform specific
+    notification APIs, so it behaves the same on Linux, macOS, Windows and
+    network mounts.
+    """
+
+    def __init__(self, index: FileIndex, interval: float):
+        super().__init__(daemon=True)
+        self.index = index
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.index.refresh()
+            except Exception:
+                # Keep watching; the next explore refreshes synchronously if needed
+                continue
+
+    def stop(self):
+        self.stopped.set()
+
+def is_git_work_tree(path: str) -> bool:
+    """Check whether a path is inside a git working tree (False if git is not installed)"""
+    try:
+        result = subprocess.run(
+            ["git", "-C", path, "rev-parse", "--is-inside-work-tree"],
+            capture_output=True, text=True
+        )
+    except OSError:
+        return False
+    return result.returncode == 0 and result.stdout.strip() == "true"
+
+def _git_ls_files(root: str, args: List[str]) -> Iterator[str]:
+    """Stream NUL separated paths from git ls-files, relative to root"""
+    process = subprocess.Popen(
+        ["git", "-C", root, "ls-files", "-z"] + args,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    try:
+        pending = b""
+        for chunk in iter(lambda: process.stdout.read(65536), b""):
+            pending += chunk
+            *paths, pending = pending.split(b"\0")
+            for path in paths:
+                yield os.fsdecode(path)
+        if process.wait() != 0:
+            raise RuntimeError(f"git ls-files failed in {root}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+def list_git_files(root: str, file_types: Optional[List[str]], exclude_dirs: List[str]) -> Iterator[Dict[str, str]]:
+    """Enumerate tracked and untracked-but-not-ignored files from the git index
+
+    Yields the same records as walk_directory. Only directories that contain
+    at least one listed file are reported, since git does not track empty
+    directories. Tracked files deleted from the working tree are skipped.
+    """
+    excluded = set(exclude_dirs)
+    deleted = set(_git_ls_files(root, ["--deleted"]))
+    seen_dirs = set()
+    previous = None
+    for rel in _git_ls_files(root, ["--cached", "--others", "--exclude-standard"]):
+        # Unmerged paths are listed once per stage
+        if rel == previous or rel in deleted:
+            continue
+        previous = rel
+        parts = rel.split("/")
+        if excluded.intersection(parts[:-1]):
+            continue
+        for depth in range(1, len(parts)):
+            directory = "/".join(parts[:depth])
+            if directory not in seen_dirs:
+                seen_dirs.add(directory)
+                yield {"kind": "directory", "path": os.path.join(root, *parts[:depth])}
+        if matches_file_types(parts[-1], file_types):
+            yield {"kind": "file", "path": os.path.join(root, *parts), "type": parts[-1].split(".")[-1]}
+
+def hash_file(path: str) -> str:
+    """Hash a file in fixed-size chunks so large files are never fully loaded"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(manifest_id: str) -> Optional[Dict]:
+    """Load a stored manifest, or None if the id is unknown"""
+    # Ids are generated hex strings; refuse anything that could escape MANIFEST_DIR
+    if not manifest_id.isalnum():
+        return None
+    try:
+        with open(os.path.join(MANIFEST_DIR, f"{manifest_id}.json"), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_manifest(manifest: Dict) -> str:
+    """Store a manifest under a new id and drop the oldest ones beyond the retention limit"""
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    manifest_id = uuid.uuid4().hex
+    with open(os.path.join(MANIFEST_DIR, f"{manifest_id}.json"), 'w') as f:
+        json.dump(manifest, f)
+
+    stored = [os.path.join(MANIFEST_DIR, name) for name in os.listdir(MANIFEST_DIR) if name.endswith(".json")]
+    if len(stored) > MANIFEST_RETENTION:
+        stored.sort(key=os.path.getmtime)
+        for path in stored[:len(stored) - MANIFEST_RETENTION]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return manifest_id
+
+def build_manifest(request: ManifestRequest) -> ManifestResponse:
+    """Record size, mtime and content hash for every file under a root
+
+    Files whose size and mtime match the baseline manifest reuse its hash
+    instead of being read again; everything else is hashed in parallel.
+    """
+    root = os.path.abspath(request.path)
+    baseline_files = {}
+    if request.baseline_id:
+        baseline = load_manifest(request.baseline_id)
+        if baseline is not None and baseline["root"] == root:
+            baseline_files = baseline["files"]
+
+    paths = [entry["path"] for entry in iter_entries(request) if entry["kind"] == "file"]
+
+    def manifest_entry(path: str) -> Tuple[str, Optional[List], bool]:
+        rel = os.path.relpath(path, request.path)
+        try:
+            stat = os.stat(path)
+            previous = baseline_files.get(rel)
+            if previous and previous[0] == stat.st_size and previous[1] == stat.st_mtime_ns:
+                return rel, previous, False
+            return rel, [stat.st_size, stat.st_mtime_ns, hash_file(path)], True
+        except OSError:
+            # Vanished or unreadable between listing and hashing
+            return rel, None, False
+
+    files = {}
+    hashed = 0
+    with ThreadPoolExecutor(max_workers=max(1, request.max_workers)) as executor:
+        for rel, entry, was_hashed in executor.map(manifest_entry, paths):
+            if entry is not None:
+                files[rel] = entry
+                hashed += was_hashed
+
+    manifest_id = save_manifest({"root": root, "created": time.time(), "files": files})
+    return ManifestResponse(
+        manifest_id=manifest_id,
+        root=root,
+        file_count=len(files),
+        hashed=hashed,
+        reused=len(files) - hashed
+    )
+
+def diff_manifests(base: Dict, head: Dict) -> ManifestDiff:
+    """Compare two manifests by content hash"""
+    base_files = base["files"]
+    head_files = head["files"]
+    added = sorted(path for path in head_files if path not in base_files)
+    removed = sorted(path for path in base_files if path not in head_files)
+    modified = sorted(
+        path for path, entry in head_files.items()
+        if path in base_files and base_files[path][2] != entry[2]
+    )
+    unchanged = len(head_files) - len(added) - len(modified)
+    return ManifestDiff(added=added, removed=removed, modified=modified, unchanged=unchanged)
+
+_indexes: Dict[str, FileIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_file_index(path: str, exclude_dirs: List[str]) -> FileIndex:
+    """Return the shared in-memory index for a root, loading it from disk on first use"""
+    key = json.dumps([os.path.abspath(path), sorted(set(exclude_dirs))])
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = FileIndex(path, exclude_dirs)
+        return _indexes[key]
+
+def iter_entries(request: FileExplorerRequest) -> Iterator[Dict[str, str]]:
+    """Enumerate files and directories for a request using the configured backend"""
+    # Git enumeration falls back to the index or a plain walk outside a working tree
+    if request.use_git and is_git_work_tree(request.path):
+        return list_git_files(request.path, request.file_types, request.exclude_dirs)
+    if request.use_index:
+        index = get_file_index(request.path, request.exclude_dirs)
+        # A running watcher already keeps the index current
+        if index.watcher is None:
+            index.refresh()
+        return index.iter_entries(request.file_types, base=request.path)
+    return walk_directory(request.path, request.file_types, request.exclude_dirs)
+
+def stream_explore(request: FileExplorerRequest) -> Iterator[str]:
+    """Serialize a directory walk as NDJSON lines, ending with a summary record"""
+    file_count = 0
+    directory_count = 0
+    type_counts: Dict[str, int] = {}
+    for entry in iter_entries(request):
+        if entry["kind"] == "file":
+            file_count += 1
+            type_counts[entry["type"]] = type_counts.get(entry["type"], 0) + 1
+        else:
+            directory_count += 1
+        yield json.dumps(entry) + "\n"
+    yield json.dumps({
+        "kind": "summary",
+        "files": file_count,
+        "directories": directory_count,
+        "file_types": type_counts
+    }) + "\n"
+
+def collect_explore(request: FileExplorerRequest) -> FileExplorerResponse:
+    """Run a full directory walk and collect it into a single response"""
+    files = []
+    directories = []
+    type_counts: Dict[str, int] = {}
+    for entry in iter_entries(request):
+        if entry["kind"] == "file":
+            files.append({"path": entry["path"], "type": entry["type"]})
+            type_counts[entry["type"]] = type_counts.get(entry["type"], 0) + 1
+        else:
+            directories.append(entry["path"])
+    return FileExplorerResponse(files=files, directories=directories, file_types=type_counts)
+
+def compact_explore(request: CompactExplorerRequest) -> CompactExplorerResponse:
+    """Run a directory walk and encode it as an interned path table"""
+    # Normalise the root the same way os.path.dirname reports it for children
+    root = os.path.dirname(os.path.join(request.path, "_"))
+    directory_ids = {root: 0}
+    directories: List[Tuple[int, str]] = [(-1, root)]
+    type_ids: Dict[str, int] = {}
+    files: List[Tuple[int, str, int]] = []
+    type_counts: Dict[str, int] = {}
+    file_count = 0
+
+    def directory_id(path: str) -> int:
+        if path not in directory_ids:
+            parent, name = os.path.split(path)
+            directories.append((directory_id(parent), name))
+            directory_ids[path] = len(directories) - 1
+        return directory_ids[path]
+
+    for entry in iter_entries(request):
+        if entry["kind"] == "directory":
+            directory_id(entry["path"])
+            continue
+        file_count += 1
+        file_type = entry["type"]
+        type_counts[file_type] = type_counts.get(file_type, 0) + 1
+        if request.counts_only:
+            continue
+        if file_type not in type_ids:
+            type_ids[file_type] = len(type_ids)
+        parent, name = os.path.split(entry["path"])
+        files.append((directory_id(parent), name, type_ids[file_type]))
+
+    return CompactExplorerResponse(
+        root=root,
+        directories=[] if request.counts_only else directories,
+        types=list(type_ids),
+        files=files,
+        file_count=file_count,
+        directory_count=len(directories) - 1,
+        file_types=type_counts
+    )
+
+async def path_exists(path: str) -> bool:
+    """os.path.exists in the threadpool, so a stat on a hung network mount cannot block the event loop"""
+    return await run_in_threadpool(os.path.exists, path)
+
+def explore_existing(explore: Callable[[CompactExplorerRequest], BaseModel],
+                     request: CompactExplorerRequest) -> Optional[BaseModel]:
+    """Run an explore, or return None if the root does not exist
+
+    The existence check runs here, in the executor, because stat on a hung
+    network mount would otherwise block the event loop.
+    """
+    if not os.path.exists(request.path):
+        return None
+    return explore(request)
+
+async def stream_batch_explore(request: BatchExplorerRequest):
+    """Explore many roots concurrently and yield one NDJSON record per root as it finishes"""
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max(1, min(request.max_workers, EXPLORE_WORKERS)))
+
+    async def explore_root(path: str) -> Dict:
+        async with semaphore:
+            root_request = CompactExplorerRequest(
+                path=path,
+                file_types=request.file_types,
+                exclude_dirs=request.exclude_dirs,
+                use_index=request.use_index,
+                use_git=request.use_git
+            )
+            explore = compact_explore if request.compact else collect_explore
+            try:
+                result = await loop.run_in_executor(_explore_executor, explore_existing, explore, root_request)
+            except Exception as e:
+                return {"kind": "root", "root": path, "error": str(e)}
+            if result is None:
+                return {"kind": "root", "root": path, "error": "Path not found"}
+            return {"kind": "root", "root": path, "result": result.model_dump()}
+
+    tasks = [asyncio.ensure_future(explore_root(path)) for path in request.paths]
+    failed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            record = await next_done
+            if "error" in record:
+                failed += 1
+            yield json.dumps(record) + "\n"
+        yield json.dumps({"kind": "summary", "roots": len(tasks), "failed": failed}) + "\n"
+    finally:
+        # Client went away: drop roots that have not started walking yet
+        for task in tasks:
+            task.cancel()
 
 @app.post("/explore", response_model=FileExplorerResponse)
 async def explore_directory(request: FileExplorerRequest):
     try:
-        if not os.path.exists(request.path):
+        if not await path_exists(request.path):
             raise HTTPException(status_code=404, detail="Path not found")
-        
-        files = []
-        directories = []
-        
-        for root, dirs, filenames in os.walk(request.path):
-            for filename in filenames:
-                if any(filename.endswith(ft) for ft in request.file_types):
-                    files.append({
-                        "path": os.path.join(root, filename),
-                        "type": filename.split(".")[-1]
-                    })
-            directories.extend([os.path.join(root, d) for d in dirs])
-        
-        return FileExplorerResponse(files=files, directories=directories)
-    
+
+        # The walk blocks, so keep it off the event loop
+        return await run_in_threadpool(collect_explore, request)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/explore/stream")
+async def explore_directory_stream(request: FileExplorerRequest):
+    """Stream the directory walk as NDJSON while it is in progress"""
+    if not await path_exists(request.path):
+        raise HTTPException(status_code=404, detail="Path not found")
+
+    # Starlette iterates synchronous generators in a worker thread
+    return StreamingResponse(stream_explore(request), media_type="application/x-ndjson")
+
+@app.post("/explore/compact", response_model=CompactExplorerResponse)
+async def explore_directory_compact(request: CompactExplorerRequest):
+    """Explore a directory and return a prefix-free path table, or only per-type counts"""
+    try:
+        if not await path_exists(request.path):
+            raise HTTPException(status_code=404, detail="Path not found")
+
+        return await run_in_threadpool(compact_explore, request)
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/explore/batch")
+async def explore_batch(request: BatchExplorerRequest):
+    """Explore many roots on a bounded thread pool, streaming per-root results as NDJSON"""
+    return StreamingResponse(stream_batch_explore(request), media_type="application/x-ndjson")
+
+@app.post("/manifest", response_model=ManifestResponse)
+async def create_manifest(request: ManifestRequest):
+    """Snapshot content hashes for a tree, reusing unchanged entries from a baseline manifest"""
+    try:
+        if not await path_exists(request.path):
+            raise HTTPException(status_code=404, detail="Path not found")
+        if request.baseline_id and load_manifest(request.baseline_id) is None:
+            raise HTTPException(status_code=404, detail="Baseline manifest not found")
+
+        return await run_in_threadpool(build_manifest, request)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/manifest/diff", response_model=ManifestDiff)
+async def diff_manifest(request: ManifestDiffRequest):
+    """Report files added, removed and modified between two manifests"""
+    base = load_manifest(request.base_id)
+    head = load_manifest(request.head_id)
+    if base is None or head is None:
+        raise HTTPException(status_code=404, detail="Manifest not found")
+    return diff_manifests(base, head)
+
+@app.post("/index/refresh", response_model=IndexDelta)
+async def refresh_index(request: FileExplorerRequest):
+    """Refresh the persistent index for a path and return what changed since the last refresh"""
+    try:
+        if not await path_exists(request.path):
+            raise HTTPException(status_code=404, detail="Path not found")
+
+        index = get_file_index(request.path, request.exclude_dirs)
+        return await run_in_threadpool(index.refresh, True)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/index/watch", response_model=Dict)
+async def watch_index(request: IndexWatchRequest):
+    """Start keeping the index for a path hot in the background"""
+    try:
+        if not await path_exists(request.path):
+            raise HTTPException(status_code=404, detail="Path not found")
+
+        index = get_file_index(request.path, request.exclude_dirs)
+        if index.watcher is None:
+            await run_in_threadpool(index.refresh)
+            index.watcher = IndexWatcher(index, request.interval)
+            index.watcher.start()
+
+        return {"path": index.root, "watching": True, "interval": index.watcher.interval}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/index/unwatch", response_model=Dict)
+async def unwatch_index(request: IndexWatchRequest):
+    """Stop the background watcher for a path"""
+    index = get_file_index(request.path, request.exclude_dirs)
+    if index.watcher is not None:
+        index.watcher.stop()
+        index.watcher = None
+    return {"path": index.root, "watching": False}
+
 if __name__ == "__main__":
     import uvicorn
     from config import MCP_SERVERS
-    
+
     server_config = MCP_SERVERS["file_explorer"]
-    uvicorn.run(app, host=server_config["host"], port=server_config["port"]) 
\ No newline at end of file
+    uvicorn.run(app, host=server_config["host"], port=server_config["port"])
@@ -1,15 +1,70 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import xmltodict
 import re
-from typing import Dict, List, Optional
+import json
+import asyncio
+import bisect
+import mmap
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Iterator, Set, Tuple
 import os
+from mcp.java_lexer import scan_java_header
+from mcp.parse_cache import cached_parse
+from mcp.pom_model import LOCAL_REPOSITORY, effective_pom, load_pom_model, reactor_modules, topological_levels
 
 app = FastAPI(title="File Parser MCP")
 
+# Worker processes used for batch parsing
+PARSER_WORKERS = int(os.getenv("PARSER_WORKERS", str(os.cpu_count() or 1)))
+DEFAULT_EXCLUDE_DIRS = ["target", ".git", "node_modules", "migration_logs"]
+
+# Java headers are scanned from the first block of the file, growing only if no type was found
+HEADER_READ_SIZE = 16 * 1024
+
+# Bump when a parser's output changes so stale entries in the parse cache are ignored
+JAVA_PARSER_VERSION = "1"
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+# Literal references that block a javax-to-jakarta or JDK upgrade, mapped to their category
+BLOCKER_PATTERNS = {
+    "javax.servlet": "jakarta-namespace",
+    "javax.persistence": "jakarta-namespace",
+    "javax.validation": "jakarta-namespace",
+    "javax.transaction": "jakarta-namespace",
+    "javax.ws.rs": "jakarta-namespace",
+    "javax.inject": "jakarta-namespace",
+    "javax.jms": "jakarta-namespace",
+    "javax.mail": "jakarta-namespace",
+    "javax.websocket": "jakarta-namespace",
+    "javax.faces": "jakarta-namespace",
+    "javax.ejb": "jakarta-namespace",
+    "javax.enterprise": "jakarta-namespace",
+    "javax.annotation.PostConstruct": "jakarta-namespace",
+    "javax.annotation.PreDestroy": "jakarta-namespace",
+    "javax.annotation.Resource": "jakarta-namespace",
+    "javax.xml.bind": "removed-jdk-module",
+    "javax.xml.ws": "removed-jdk-module",
+    "javax.jws": "removed-jdk-module",
+    "javax.activation": "removed-jdk-module",
+    "javax.xml.soap": "removed-jdk-module",
+    "com.sun.xml.bind": "removed-jdk-module",
+    "sun.misc.": "internal-jdk-api",
+    "sun.reflect.": "internal-jdk-api",
+    "sun.security.": "internal-jdk-api",
+    "com.sun.image.codec.jpeg": "internal-jdk-api",
+    "com.sun.net.ssl": "internal-jdk-api"
+}
+SCAN_FILE_TYPES = [".java", ".kt", ".groovy", ".xml", ".properties", ".yml", ".yaml"]
+
 class ParserRequest(BaseModel):
     file_path: str
     file_type: str
+    all_types: bool = False
 
 class Dependency(BaseModel):
     groupId: str
@@ -17,16 +72,408 @@ class Dependency(BaseModel):
     version: str
     scope: Optional[str] = None
 
+class Plugin(BaseModel):
+    groupId: str
+    artifactId: str
+    version: Optional[str] = None
+
+class POMProfile(BaseModel):
+    id: str
+    active_by_default: bool = False
+    properties: Dict[str, str] = {}
+    dependencies: List[Dependency] = []
+    managed_dependencies: List[Dependency] = []
+    plugins: List[Plugin] = []
+    modules: List[str] = []
+
 class POMAnalysis(BaseModel):
     java_version: str
     dependencies: List[Dependency]
     properties: Dict[str, str]
+    parent_chain: Optional[List[str]] = None
+    managed_dependencies: Optional[List[Dependency]] = None
+    plugins: Optional[List[Plugin]] = None
+    managed_plugins: Optional[List[Plugin]] = None
+    profiles: Optional[List[POMProfile]] = None
+
+class EffectivePOMRequest(BaseModel):
+    file_path: str
+    local_repository: Optional[str] = None
+
+class ReactorRequest(BaseModel):
+    project_path: str
+    local_repository: Optional[str] = None
+
+class ReactorModule(BaseModel):
+    id: str
+    path: str
+    pom_path: str
+    packaging: str
+    version: Optional[str] = None
+    modules: List[str]
+    depends_on: List[str]
+
+class ReactorGraph(BaseModel):
+    modules: List[ReactorModule]
+    levels: List[List[str]]
+
+class ScanRequest(BaseModel):
+    file_paths: Optional[List[str]] = None
+    directory: Optional[str] = None
+    exclude_dirs: List[str] = DEFAULT_EXCLUDE_DIRS
+    file_types: List[str] = SCAN_FILE_TYPES
+    # Literal pattern -> category; defaults to BLOCKER_PATTERNS
+    patterns: Optional[Dict[str, str]] = None
+    chunk_size: int = 64
+
+class ImportIndexRequest(BaseModel):
+    directory: str
+    exclude_dirs: List[str] = DEFAULT_EXCLUDE_DIRS
+
+class ImportIndexStats(BaseModel):
+    files: int
+    parsed: int
+    removed: int
+    imports: int
+
+class ImportQueryRequest(ImportIndexRequest):
+    prefixes: List[str]
+    refresh: bool = False
+
+class ImportMatch(BaseModel):
+    imports: List[str]
+    files: List[str]
+
+class ImportQueryResponse(BaseModel):
+    matches: Dict[str, ImportMatch]
 
 class JavaFileAnalysis(BaseModel):
     imports: List[str]
     class_name: str
     package_name: str
     java_version: Optional[str] = None
+    file_path: Optional[str] = None
+    static_imports: List[str] = []
+    types: List[Dict[str, str]] = []
+
+class BatchParserRequest(BaseModel):
+    file_paths: Optional[List[str]] = None
+    directory: Optional[str] = None
+    exclude_dirs: List[str] = DEFAULT_EXCLUDE_DIRS
+    chunk_size: int = 64
+    all_types: bool = False
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Create the shared parser process pool on first use"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=PARSER_WORKERS)
+    return _process_pool
+
+def analyze_java_file(file_path: str, all_types: bool = False) -> Dict:
+    """Extract package, imports and top-level types from a Java source file
+
+    Only the header is read unless all_types is set: the file is read in
+    growing blocks until the first type declaration has been seen in full.
+    """
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        if all_types:
+            header = scan_java_header(f.read(), all_types=True)
+        else:
+            java_content = f.read(HEADER_READ_SIZE)
+            while True:
+                header = scan_java_header(java_content)
+                # A type name ending exactly at the block boundary may be truncated
+                if header["types"] and header["end"] < len(java_content):
+                    break
+                more = f.read(len(java_content))
+                if not more:
+                    break
+                java_content += more
+
+    del header["end"]
+    return header
+
+def cached_java_analysis(file_path: str, all_types: bool = False) -> Dict:
+    """analyze_java_file through the shared parse cache, so unchanged files are not re-parsed"""
+    return cached_parse(
+        file_path,
+        "java-header-all" if all_types else "java-header",
+        JAVA_PARSER_VERSION,
+        lambda path: analyze_java_file(path, all_types)
+    )
+
+def parse_java_chunk(file_paths: List[str], all_types: bool = False) -> List[Dict]:
+    """Parse a chunk of Java files inside a worker process, reporting failures per file"""
+    results = []
+    for file_path in file_paths:
+        try:
+            analysis = cached_java_analysis(file_path, all_types)
+            analysis["file_path"] = file_path
+            results.append(analysis)
+        except Exception as e:
+            results.append({"file_path": file_path, "error": str(e)})
+    return results
+
+def iter_source_files(directory: str, exclude_dirs: List[str], suffixes: List[str]) -> Iterator[str]:
+    """Yield files with the given suffixes under a directory, pruning excluded directories"""
+    excluded = set(exclude_dirs)
+    suffixes = tuple(suffixes)
+    for root, dirs, filenames in os.walk(directory):
+        dirs[:] = [d for d in dirs if d not in excluded]
+        for filename in filenames:
+            if filename.endswith(suffixes):
+                yield os.path.join(root, filename)
+
+def iter_java_files(directory: str, exclude_dirs: List[str]) -> Iterator[str]:
+    """Yield Java source files under a directory, pruning excluded directories"""
+    return iter_source_files(directory, exclude_dirs, [".java"])
+
+async def stream_pool_results(worker, file_paths: List[str], chunk_size: int, *args):
+    """Run a chunk worker across the process pool and yield NDJSON records as chunks complete"""
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    chunk_size = max(1, chunk_size)
+    chunks = [file_paths[i:i + chunk_size] for i in range(0, len(file_paths), chunk_size)]
+    # Keep every worker busy without queueing the whole batch up front
+    max_in_flight = PARSER_WORKERS * 2
+    pending = set()
+    next_chunk = 0
+    try:
+        while next_chunk < len(chunks) or pending:
+            while next_chunk < len(chunks) and len(pending) < max_in_flight:
+                pending.add(loop.run_in_executor(pool, worker, chunks[next_chunk], *args))
+                next_chunk += 1
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                for record in future.result():
+                    yield json.dumps(record) + "\n"
+    finally:
+        for future in pending:
+            future.cancel()
+
+def stream_java_batch(file_paths: List[str], chunk_size: int, all_types: bool = False):
+    """Parse files across the process pool and yield NDJSON records as chunks complete"""
+    return stream_pool_results(parse_java_chunk, file_paths, chunk_size, all_types)
+
+def literal_trie_pattern(literals: List[str]) -> bytes:
+    """Compile literals into one trie-shaped regex so each position is tested against all of them at once"""
+    trie: Dict = {}
+    for literal in literals:
+        node = trie
+        for byte in literal.encode():
+            node = node.setdefault(bytes([byte]), {})
+        node[b""] = {}
+
+    def build(node: Dict) -> bytes:
+        branches = [re.escape(key) + build(child) for key, child in sorted(node.items()) if key]
+        if not branches:
+            return b""
+        pattern = branches[0] if len(branches) == 1 else b"(?:" + b"|".join(branches) + b")"
+        # A literal ends here but longer ones continue: prefer the longest match
+        if b"" in node:
+            pattern = b"(?:" + pattern + b")?"
+        return pattern
+
+    return build(trie)
+
+@lru_cache(maxsize=16)
+def compile_catalog(patterns: Tuple[Tuple[str, str], ...]) -> "re.Pattern":
+    return re.compile(literal_trie_pattern([literal for literal, _ in patterns]))
+
+def scan_file(file_path: str, matcher: "re.Pattern", categories: Dict[str, str]) -> List[Dict]:
+    """Scan a memory-mapped file for catalog hits, reporting 1-based line and column"""
+    with open(file_path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return []
+    hits = []
+    with mapped:
+        line = 1
+        counted_to = 0
+        for match in matcher.finditer(mapped):
+            start = match.start()
+            line += mapped[counted_to:start].count(b"\n")
+            counted_to = start
+            line_start = mapped.rfind(b"\n", 0, start) + 1
+            literal = match.group().decode()
+            hits.append({
+                "pattern": literal,
+                "category": categories.get(literal, ""),
+                "line": line,
+                "column": start - line_start + 1
+            })
+    return hits
+
+def scan_chunk(file_paths: List[str], patterns: Tuple[Tuple[str, str], ...]) -> List[Dict]:
+    """Scan a chunk of files inside a worker process, returning only files with hits or errors"""
+    matcher = compile_catalog(patterns)
+    categories = dict(patterns)
+    results = []
+    for file_path in file_paths:
+        try:
+            hits = scan_file(file_path, matcher, categories)
+        except Exception as e:
+            results.append({"file_path": file_path, "error": str(e)})
+            continue
+        if hits:
+            results.append({"file_path": file_path, "hits": hits})
+    return results
+
+
+class ImportIndex:
+    """Inverted index from imported names to the Java files that import them
+
+    Files are re-parsed only when their mtime changes. Queries are plain
+    string prefixes over the sorted import names, so "javax." matches every
+    javax import; wildcard imports of a queried name's package also match.
+    """
+
+    def __init__(self, directory: str, exclude_dirs: List[str]):
+        self.directory = directory
+        self.exclude_dirs = exclude_dirs
+        # Path -> (mtime, imports including static imports)
+        self.files: Dict[str, Tuple[int, List[str]]] = {}
+        self.postings: Dict[str, Set[str]] = {}
+        self.sorted_imports: Optional[List[str]] = None
+        self.built = False
+        self.lock = threading.Lock()
+
+    def _add(self, file_path: str, mtime: int, imports: List[str]):
+        self.files[file_path] = (mtime, imports)
+        for name in imports:
+            if name not in self.postings:
+                self.postings[name] = set()
+                self.sorted_imports = None
+            self.postings[name].add(file_path)
+
+    def _remove(self, file_path: str):
+        _, imports = self.files.pop(file_path, (None, []))
+        for name in imports:
+            files = self.postings.get(name)
+            if files is not None:
+                files.discard(file_path)
+                if not files:
+                    del self.postings[name]
+                    self.sorted_imports = None
+
+    def refresh(self) -> ImportIndexStats:
+        """Re-parse new and modified files and drop deleted ones"""
+        current = {}
+        for file_path in iter_java_files(self.directory, self.exclude_dirs):
+            try:
+                current[file_path] = os.stat(file_path).st_mtime_ns
+            except OSError:
+                continue
+
+        with self.lock:
+            stale = [path for path, mtime in current.items() if self.files.get(path, (None,))[0] != mtime]
+            removed = [path for path in self.files if path not in current]
+
+        # Parse outside the lock so queries keep answering from the previous state
+        chunk_size = 64
+        chunks = [stale[i:i + chunk_size] for i in range(0, len(stale), chunk_size)]
+        records = [record for chunk in get_process_pool().map(parse_java_chunk, chunks) for record in chunk]
+
+        with self.lock:
+            for file_path in removed:
+                self._remove(file_path)
+            for record in records:
+                self._remove(record["file_path"])
+                if "error" not in record:
+                    self._add(
+                        record["file_path"],
+                        current[record["file_path"]],
+                        record["imports"] + record["static_imports"]
+                    )
+            self.built = True
+            return ImportIndexStats(
+                files=len(self.files),
+                parsed=len(records),
+                removed=len(removed),
+                imports=len(self.postings)
+            )
+
+    def query(self, prefix: str) -> ImportMatch:
+        """Find imports starting with a prefix and the files that use them"""
+        with self.lock:
+            if self.sorted_imports is None:
+                self.sorted_imports = sorted(self.postings)
+            names = []
+            start = bisect.bisect_left(self.sorted_imports, prefix)
+            for name in self.sorted_imports[start:]:
+                if not name.startswith(prefix):
+                    break
+                names.append(name)
+            # "import a.b.*" covers a query for a.b.C
+            parts = prefix.split(".")
+            for depth in range(1, len(parts)):
+                wildcard = ".".join(parts[:depth]) + ".*"
+                if wildcard in self.postings and wildcard not in names:
+                    names.append(wildcard)
+            files = set()
+            for name in names:
+                files.update(self.postings[name])
+            return ImportMatch(imports=names, files=sorted(files))
+
+_import_indexes: Dict[str, ImportIndex] = {}
+_import_indexes_lock = threading.Lock()
+
+def get_import_index(directory: str, exclude_dirs: List[str]) -> ImportIndex:
+    """Return the shared import index for a directory"""
+    key = json.dumps([os.path.abspath(directory), sorted(set(exclude_dirs))])
+    with _import_indexes_lock:
+        if key not in _import_indexes:
+            _import_indexes[key] = ImportIndex(directory, exclude_dirs)
+        return _import_indexes[key]
+
+
+def build_reactor_graph(project_path: str, local_repository: str) -> ReactorGraph:
+    """Discover all reactor modules, parsing each level of <modules> concurrently"""
+    modules = reactor_modules(project_path, local_repository, PARSER_WORKERS)
+    return ReactorGraph(
+        modules=[ReactorModule(**module) for module in modules],
+        levels=topological_levels({module["id"]: module["depends_on"] for module in modules})
+    )
+
+def _pom_dependency(dep: Dict) -> Dependency:
+    return Dependency(
+        groupId=dep["groupId"],
+        artifactId=dep["artifactId"],
+        version=dep["version"] or "",
+        scope=dep["scope"]
+    )
+
+def _pom_plugin(plugin: Dict) -> Plugin:
+    return Plugin(groupId=plugin["groupId"], artifactId=plugin["artifactId"], version=plugin["version"])
+
+def analyze_pom_file(file_path: str) -> POMAnalysis:
+    """Analyze a single POM as declared, without parent inheritance"""
+    model = load_pom_model(file_path)
+    properties = model["properties"]
+
+    return POMAnalysis(
+        java_version=properties.get('java.version') or properties.get('maven.compiler.source') or "",
+        dependencies=[_pom_dependency(dep) for dep in model["dependencies"]],
+        properties=properties,
+        managed_dependencies=[_pom_dependency(dep) for dep in model["dependency_management"]],
+        plugins=[_pom_plugin(plugin) for plugin in model["plugins"]],
+        managed_plugins=[_pom_plugin(plugin) for plugin in model["plugin_management"]],
+        profiles=[
+            POMProfile(
+                id=profile["id"],
+                active_by_default=profile["active_by_default"],
+                properties=profile["properties"],
+                dependencies=[_pom_dependency(dep) for dep in profile["dependencies"]],
+                managed_dependencies=[_pom_dependency(dep) for dep in profile["dependency_management"]],
+                plugins=[_pom_plugin(plugin) for plugin in profile["plugins"]],
+                modules=profile["modules"]
+            )
+            for profile in model["profiles"]
+        ]
+    )
 
 @app.post("/parse/pom", response_model=POMAnalysis)
 async def parse_pom(request: ParserRequest):
@@ -34,40 +481,118 @@ async def parse_pom(request: ParserRequest):
         if not os.path.exists(request.file_path):
             raise HTTPException(status_code=404, detail="POM file not found")
         
-        with open(request.file_path, 'r') as f:
-            pom_content = f.read()
-        
-        pom_dict = xmltodict.parse(pom_content)
-        project = pom_dict['project']
-        
-        # Extract Java version
-        java_version = None
-        if 'properties' in project and 'java.version' in project['properties']:
-            java_version = project['properties']['java.version']
-        elif 'properties' in project and 'maven.compiler.source' in project['properties']:
-            java_version = project['properties']['maven.compiler.source']
-        
-        # Extract dependencies
-        dependencies = []
-        if 'dependencies' in project and 'dependency' in project['dependencies']:
-            deps = project['dependencies']['dependency']
-            if not isinstance(deps, list):
-                deps = [deps]
-            
-            for dep in deps:
-                dependencies.append(Dependency(
-                    groupId=dep.get('groupId', ''),
-                    artifactId=dep.get('artifactId', ''),
-                    version=dep.get('version', ''),
-                    scope=dep.get('scope')
-                ))
-        
+        return await run_in_threadpool(analyze_pom_file, request.file_path)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/parse/pom/effective", response_model=POMAnalysis)
+async def parse_effective_pom(request: EffectivePOMRequest):
+    """Analyze a POM after parent inheritance, property interpolation and dependencyManagement"""
+    try:
+        if not os.path.exists(request.file_path):
+            raise HTTPException(status_code=404, detail="POM file not found")
+
+        effective = await run_in_threadpool(
+            effective_pom, request.file_path, request.local_repository or LOCAL_REPOSITORY
+        )
+
         return POMAnalysis(
-            java_version=java_version,
-            dependencies=dependencies,
-            properties=project.get('properties', {})
+            java_version=effective["java_version"] or "",
+            dependencies=[
+                Dependency(
+                    groupId=dep["groupId"],
+                    artifactId=dep["artifactId"],
+                    version=dep["version"] or "",
+                    scope=dep["scope"]
+                )
+                for dep in effective["dependencies"]
+            ],
+            properties=effective["properties"],
+            parent_chain=effective["parent_chain"]
         )
-    
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/reactor", response_model=ReactorGraph)
+async def reactor_graph(request: ReactorRequest):
+    """Build the multi-module reactor DAG and its topological build levels"""
+    try:
+        root_pom = request.project_path
+        if os.path.isdir(root_pom):
+            root_pom = os.path.join(root_pom, "pom.xml")
+        if not os.path.exists(root_pom):
+            raise HTTPException(status_code=404, detail="POM file not found")
+
+        return await run_in_threadpool(
+            build_reactor_graph, request.project_path, request.local_repository or LOCAL_REPOSITORY
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/scan")
+async def scan_blockers(request: ScanRequest):
+    """Scan sources for migration blocker references across the process pool, streaming hits as NDJSON"""
+    if request.file_paths is None and request.directory is None:
+        raise HTTPException(status_code=400, detail="Either file_paths or directory is required")
+
+    file_paths = list(request.file_paths or [])
+    if request.directory is not None:
+        if not os.path.isdir(request.directory):
+            raise HTTPException(status_code=404, detail="Directory not found")
+        file_paths.extend(await run_in_threadpool(
+            lambda: list(iter_source_files(request.directory, request.exclude_dirs, request.file_types))
+        ))
+
+    patterns = tuple(sorted((request.patterns or BLOCKER_PATTERNS).items()))
+    if not patterns:
+        raise HTTPException(status_code=400, detail="At least one pattern is required")
+
+    return StreamingResponse(
+        stream_pool_results(scan_chunk, file_paths, request.chunk_size, patterns),
+        media_type="application/x-ndjson"
+    )
+
+@app.post("/imports/index", response_model=ImportIndexStats)
+async def index_imports(request: ImportIndexRequest):
+    """Build or incrementally refresh the inverted import index for a directory"""
+    try:
+        if not os.path.isdir(request.directory):
+            raise HTTPException(status_code=404, detail="Directory not found")
+
+        index = get_import_index(request.directory, request.exclude_dirs)
+        return await run_in_threadpool(index.refresh)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/imports/query", response_model=ImportQueryResponse)
+async def query_imports(request: ImportQueryRequest):
+    """Find the files importing each prefix, such as javax. or sun.misc.Unsafe"""
+    try:
+        if not os.path.isdir(request.directory):
+            raise HTTPException(status_code=404, detail="Directory not found")
+
+        index = get_import_index(request.directory, request.exclude_dirs)
+        if request.refresh or not index.built:
+            await run_in_threadpool(index.refresh)
+
+        return ImportQueryResponse(matches={prefix: index.query(prefix) for prefix in request.prefixes})
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -77,29 +602,33 @@ async def parse_java(request: ParserRequest):
         if not os.path.exists(request.file_path):
             raise HTTPException(status_code=404, detail="Java file not found")
         
-        with open(request.file_path, 'r') as f:
-            java_content = f.read()
-        
-        # Extract package name
-        package_match = re.search(r'package\s+([^;]+);', java_content)
-        package_name = package_match.group(1) if package_match else ""
-        
-        # Extract class name
-        class_match = re.search(r'class\s+(\w+)', java_content)
-        class_name = class_match.group(1) if class_match else ""
-        
-        # Extract imports
-        imports = re.findall(r'import\s+([^;]+);', java_content)
-        
-        return JavaFileAnalysis(
-            imports=imports,
-            class_name=class_name,
-            package_name=package_name
-        )
+        analysis = await run_in_threadpool(cached_java_analysis, request.file_path, request.all_types)
+        return JavaFileAnalysis(**analysis)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/parse/java/batch")
+async def parse_java_batch(request: BatchParserRequest):
+    """Parse many Java files on a process pool, streaming JavaFileAnalysis records as NDJSON"""
+    if request.file_paths is None and request.directory is None:
+        raise HTTPException(status_code=400, detail="Either file_paths or directory is required")
+
+    file_paths = list(request.file_paths or [])
+    if request.directory is not None:
+        if not os.path.isdir(request.directory):
+            raise HTTPException(status_code=404, detail="Directory not found")
+        file_paths.extend(await run_in_threadpool(
+            lambda: list(iter_java_files(request.directory, request.exclude_dirs))
+        ))
+
+    return StreamingResponse(
+        stream_java_batch(file_paths, request.chunk_size, request.all_types),
+        media_type="application/x-ndjson"
+    )
+
 if __name__ == "__main__":
     import uvicorn
     from config import MCP_SERVERS
@@ -0,0 +1,142 @@
+import re
+from typing import Dict, Iterator, Optional
+
+# Whitespace, comments and literals are matched without a group so the scanner skips them
+_JAVA_TOKEN = re.compile(r'''
+      \s+
+    | //[^\n]*
+    | /\*.*?(?:\*/|\Z)
+    | """.*?(?:(?<!\\)"""|\Z)
+    | "(?:\\.|[^"\\\n])*"?
+    | '(?:\\.|[^'\\\n])*'?
+    | (?P<ident>(?:[^\W\d]|\$)[\w$]*)
+    | (?P<punct>.)
+''', re.DOTALL | re.VERBOSE)
+
+JAVA_TYPE_KINDS = {"class", "interface", "enum", "record"}
+
+class JavaTokens:
+    """Token stream over Java source with one token of lookahead"""
+
+    def __init__(self, source: str):
+        self._matches = _JAVA_TOKEN.finditer(source)
+        self._peeked = None
+        self.end = 0
+
+    def peek(self) -> Optional[str]:
+        while self._peeked is None:
+            match = next(self._matches, None)
+            if match is None:
+                return None
+            if match.lastgroup:
+                self._peeked = match
+        return self._peeked.group()
+
+    def next(self) -> Optional[str]:
+        token = self.peek()
+        if token is not None:
+            self.end = self._peeked.end()
+            self._peeked = None
+        return token
+
+    def read_name(self) -> str:
+        """Consume tokens up to the next ';' and join them into a qualified name"""
+        parts = []
+        while True:
+            token = self.next()
+            if token is None or token == ";":
+                return "".join(parts)
+            parts.append(token)
+
+    def skip_balanced(self, open_token: str, close_token: str):
+        """Skip past the close token matching an already consumed open token"""
+        depth = 1
+        while depth:
+            token = self.next()
+            if token is None:
+                return
+            if token == open_token:
+                depth += 1
+            elif token == close_token:
+                depth -= 1
+
+def scan_java_header(source: str, all_types: bool = False) -> Dict:
+    """Single-pass, comment and string aware scan of a Java compilation unit header
+
+    Extracts the package, imports, static imports and top-level type
+    declarations. Scanning stops at the first type declaration unless
+    all_types is set, in which case type bodies are skipped by brace
+    matching to find the remaining top-level types.
+    """
+    tokens = JavaTokens(source)
+    package_name = ""
+    imports = []
+    static_imports = []
+    types = []
+
+    while True:
+        token = tokens.next()
+        if token is None:
+            break
+        if token == "package":
+            package_name = tokens.read_name()
+            continue
+        if token == "import":
+            if tokens.peek() == "static":
+                tokens.next()
+                static_imports.append(tokens.read_name())
+            else:
+                imports.append(tokens.read_name())
+            continue
+        if token == "{":
+            # Module declarations and other bodies we do not care about
+            tokens.skip_balanced("{", "}")
+            continue
+        if token == "@" and tokens.peek() == "interface":
+            tokens.next()
+            kind = "annotation"
+        elif token == "@":
+            # Annotation on a declaration: skip its name and arguments
+            tokens.next()
+            while tokens.peek() == ".":
+                tokens.next()
+                tokens.next()
+            if tokens.peek() == "(":
+                tokens.next()
+                tokens.skip_balanced("(", ")")
+            continue
+        elif token in JAVA_TYPE_KINDS:
+            kind = token
+        else:
+            # Modifiers and stray separators
+            continue
+
+        name = tokens.next()
+        if name is None:
+            break
+        types.append({"name": name, "kind": kind})
+        if not all_types:
+            break
+        # Skip to the type body, stepping over record headers and annotation arguments
+        while True:
+            token = tokens.next()
+            if token is None or token == "{":
+                break
+            if token == "(":
+                tokens.skip_balanced("(", ")")
+        tokens.skip_balanced("{", "}")
+
+    return {
+        "package_name": package_name,
+        "imports": imports,
+        "static_imports": static_imports,
+        "types": types,
+        "class_name": types[0]["name"] if types else "",
+        "end": tokens.end
+    }
+
+def java_identifiers(source: str) -> Iterator[str]:
+    """Identifiers and keywords of Java source, outside comments and string or char literals"""
+    for match in _JAVA_TOKEN.finditer(source):
+        if match.lastgroup == "ident":
+            yield match.group()
@@ -1,19 +1,291 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional
-import subprocess
+from typing import Awaitable, Callable, List, Dict, Iterator, Optional, Tuple
+from enum import Enum
+import asyncio
+import bisect
+import gzip
+import hashlib
+import heapq
+import io
+import itertools
 import os
 import json
 import re
+import shutil
+import signal
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from mcp.java_lexer import java_identifiers, scan_java_header
+from mcp.parse_cache import cached_parse, file_digest
+from mcp.pom_model import LOCAL_REPOSITORY, effective_pom, pom_coordinate, reactor_modules, repository_coordinate, repository_pom_path
 
 app = FastAPI(title="Maven MCP")
 
+# Bump when find_spring_boot_version changes so cached results are ignored
+SPRING_BOOT_SCAN_VERSION = "1"
+
+MAVEN_EXECUTABLE = os.getenv("MAVEN_EXECUTABLE", "mvn")
+# Longest output line read from Maven; longer lines are dropped rather than failing the run
+MAVEN_LINE_LIMIT = 1024 * 1024
+
+# Execution backend: "mvnd" (warm daemons only), "mvn" (cold JVM per run) or
+# "auto" (mvnd when installed, falling back to mvn)
+MAVEN_BACKEND = os.getenv("MAVEN_BACKEND", "auto")
+MVND_EXECUTABLE = os.getenv("MVND_EXECUTABLE", "mvnd")
+# Plain Maven log lines instead of mvnd's terminal UI, and no interactive prompts
+MVND_OPTIONS = ["-Dmvnd.rawStreams=true", "-B"]
+# Seconds a cancelled run gets to exit on SIGTERM before the process tree is killed
+MAVEN_KILL_GRACE = 10
+
+# Successful results reused while sources and options are unchanged
+MAVEN_BUILD_CACHE_PATH = os.getenv(
+    "MAVEN_BUILD_CACHE_PATH", os.path.expanduser("~/.cache/migration-assistant/build-cache.sqlite")
+)
+MAVEN_BUILD_CACHE_MAX_BYTES = int(os.getenv("MAVEN_BUILD_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+BUILD_CACHE_EXCLUDE_DIRS = ["target", ".git", "node_modules", "migration_logs", ".idea"]
+
+# Per-module report directories written by the Surefire and Failsafe plugins
+TEST_REPORT_DIRS = ["surefire-reports", "failsafe-reports"]
+# Directories that never contain modules, pruned when looking for reports
+REPORT_SCAN_SKIP_DIRS = {"target", "src", ".git", "node_modules", "migration_logs"}
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", str(os.cpu_count() or 1)))
+MAX_STACK_TRACE_CHARS = 4000
+
+_TEST_SUMMARY = re.compile(
+    r'^(?:\[\w+\] )?Tests run: (\d+), Failures: (\d+), Errors: (\d+), Skipped: (\d+)[ \t]*\r?$', re.MULTILINE
+)
+_FAILED_TESTS_SECTION = re.compile(
+    r'^(?:\[ERROR\] )?(?:Failed tests|Tests in error|Failures|Errors):[ \t]*\r?\n((?:(?:\[ERROR\])?[ \t]{2,}\S.*(?:\n|$))+)',
+    re.MULTILINE
+)
+
+# Maven output longer than this is stored as a compressed artifact and only an excerpt is returned
+MAVEN_ARTIFACT_DIR = os.getenv("MAVEN_ARTIFACT_DIR", os.path.expanduser("~/.cache/migration-assistant/maven-output"))
+MAVEN_ARTIFACT_RETENTION = int(os.getenv("MAVEN_ARTIFACT_RETENTION", "500"))
+MAVEN_OUTPUT_INLINE_LIMIT = int(os.getenv("MAVEN_OUTPUT_INLINE_LIMIT", str(64 * 1024)))
+MAVEN_OUTPUT_HEAD_LINES = 50
+MAVEN_OUTPUT_TAIL_LINES = 200
+# Uncompressed size of each independently compressed block in an artifact
+ARTIFACT_BLOCK_SIZE = 256 * 1024
+MAX_ARTIFACT_READ_LINES = 10000
+MAX_ARTIFACT_READ_BYTES = 1024 * 1024
+_ARTIFACT_ID = re.compile(r'[0-9a-f]{32}')
+
+# Default -T for selective builds; "1C" is one thread per core
+MAVEN_BUILD_THREADS = os.getenv("MAVEN_BUILD_THREADS", "1C")
+
+# Maven JVMs allowed to run at once; further jobs wait in the queue
+MAVEN_MAX_CONCURRENT_BUILDS = int(os.getenv("MAVEN_MAX_CONCURRENT_BUILDS", str(max(1, (os.cpu_count() or 2) // 2))))
+# Default number of concurrent Surefire runs for /test/sharded
+MAVEN_TEST_SHARDS = int(os.getenv("MAVEN_TEST_SHARDS", str(MAVEN_MAX_CONCURRENT_BUILDS)))
+# Left out of the per-shard project copies; target/ is kept so shards start from the compiled classes
+SHARD_COPY_SKIP_DIRS = {".git", "node_modules", "migration_logs", ".idea"}
+# Surefire's default includes, matched against test source file names
+_TEST_CLASS_FILE = re.compile(r'^(?:Test\w*|\w*Test|\w*Tests|\w*TestCase)\.java$')
+
+# Bump when the class or source reference scanners change so cached results are ignored
+TEST_IMPACT_VERSION = "2"
+# Source and compiled class roots scanned in each module for test impact analysis
+IMPACT_SOURCE_ROOTS = [os.path.join("src", "main", "java"), os.path.join("src", "test", "java")]
+IMPACT_CLASS_ROOTS = [os.path.join("target", "classes"), os.path.join("target", "test-classes")]
+# Tests using these load the whole application context, so any production change impacts them
+CONTEXT_TEST_ANNOTATIONS = {"org.springframework.boot.test.context.SpringBootTest"}
+_DESCRIPTOR_CLASS = re.compile(r'L([\w/$]+)[;<]')
+# Finished jobs kept for status and result polling
+MAVEN_JOB_RETENTION = int(os.getenv("MAVEN_JOB_RETENTION", "200"))
+
+class MavenStep(str, Enum):
+    COMPILE = "compile"
+    TEST = "test"
+    BUILD = "build"
+    PIPELINE = "pipeline"
+    TEST_SHARD = "test-shard"
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+# Goals and messages for each Maven step exposed by the server
+MAVEN_GOALS = {
+    MavenStep.COMPILE: {
+        "goals": ["compile"],
+        "skip_tests": False,
+        "reports": False,
+        "spill": True,
+        "success": "Project compiled successfully",
+        "failure": "Compilation failed"
+    },
+    MavenStep.TEST: {
+        "goals": ["test"],
+        "skip_tests": False,
+        "reports": True,
+        "spill": True,
+        "success": "Tests completed successfully",
+        "failure": "Tests failed"
+    },
+    MavenStep.BUILD: {
+        "goals": ["clean", "install"],
+        "skip_tests": True,
+        "reports": True,
+        "spill": True,
+        "success": "Build completed successfully",
+        "failure": "Build failed"
+    },
+    # Runs the request's own goals; used by /pipeline
+    MavenStep.PIPELINE: {
+        "goals": [],
+        "skip_tests": True,
+        "reports": True,
+        # Each step's share of the log is spilled separately by pipeline_response
+        "spill": False,
+        "success": "Pipeline completed successfully",
+        "failure": "Pipeline failed"
+    },
+    # One slice of /test/sharded; reports are collected once all shards finish
+    MavenStep.TEST_SHARD: {
+        "goals": [],
+        "skip_tests": False,
+        "reports": False,
+        "spill": True,
+        "success": "Test shard completed successfully",
+        "failure": "Test shard failed"
+    }
+}
+
+# Steps reported by /pipeline, in lifecycle order, and the steps each requested phase covers
+PIPELINE_STEPS = [MavenStep.COMPILE, MavenStep.TEST, MavenStep.BUILD]
+PIPELINE_PHASES = {
+    "compile": PIPELINE_STEPS[:1],
+    "test": PIPELINE_STEPS[:2],
+    "package": PIPELINE_STEPS,
+    "verify": PIPELINE_STEPS,
+    "install": PIPELINE_STEPS
+}
+# Goals whose output belongs to a fixed step; other goals follow their module's current step
+PIPELINE_GOAL_STEPS = {
+    "clean": MavenStep.COMPILE,
+    "resources": MavenStep.COMPILE,
+    "compile": MavenStep.COMPILE,
+    "testResources": MavenStep.TEST,
+    "testCompile": MavenStep.TEST,
+    "test": MavenStep.TEST,
+    "jar": MavenStep.BUILD,
+    "war": MavenStep.BUILD,
+    "ear": MavenStep.BUILD,
+    "repackage": MavenStep.BUILD,
+    "shade": MavenStep.BUILD,
+    "integration-test": MavenStep.BUILD,
+    "verify": MavenStep.BUILD,
+    "install": MavenStep.BUILD
+}
+_EXECUTION_HEADER = re.compile(r'^\[INFO\] --- (\S+) (?:\([^)]*\) )?@ (\S+) ---')
+_FAILED_GOAL = re.compile(r'^\[ERROR\] Failed to execute goal (?:(\S+) \([^)]*\) )?on project')
+
+# on_output(stream, line) receives Maven output as it is produced
+OutputCallback = Callable[[str, str], Awaitable[None]]
+
+# Shared local repository that /dependencies/prefetch fills from a Maven-layout mirror directory
+MAVEN_SHARED_REPOSITORY = os.getenv(
+    "MAVEN_SHARED_REPOSITORY", os.path.expanduser("~/.cache/migration-assistant/m2-repository")
+)
+MAVEN_MIRROR_DIR = os.getenv("MAVEN_MIRROR_DIR", "")
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "8"))
+# Lifecycle plugins Maven uses without a version in the POM (Maven 3.9 defaults); a module's
+# pluginManagement or <plugins> version takes precedence
+MAVEN_PREFETCH_PLUGINS = [coordinate.strip() for coordinate in os.getenv("MAVEN_PREFETCH_PLUGINS", ",".join([
+    "org.apache.maven.plugins:maven-clean-plugin:3.2.0",
+    "org.apache.maven.plugins:maven-resources-plugin:3.3.1",
+    "org.apache.maven.plugins:maven-compiler-plugin:3.11.0",
+    "org.apache.maven.plugins:maven-surefire-plugin:3.2.2",
+    "org.apache.maven.plugins:maven-jar-plugin:3.3.0",
+    "org.apache.maven.plugins:maven-install-plugin:3.1.1"
+])).split(",") if coordinate.strip()]
+# Phases that run Surefire or Failsafe. Surefire resolves its test framework provider at run time,
+# outside any POM, so prefetched projects are not switched to -o automatically for these
+SUREFIRE_PHASES = {
+    "test", "prepare-package", "package", "pre-integration-test", "integration-test",
+    "post-integration-test", "verify", "install", "deploy"
+}
+# Mirror bookkeeping that would tie copied artifacts to the mirror's repository id
+PREFETCH_SKIP_FILES = {"_remote.repositories", "resolver-status.properties"}
+
+_mvnd_failed = False
+_report_pool: Optional[ProcessPoolExecutor] = None
+# Prefetched projects by absolute path: shared repository, reactor POM digest and completeness
+_prefetched: Dict[str, Dict] = {}
+_prefetch_lock = threading.Lock()
+
 class MavenRequest(BaseModel):
     project_path: str
-    goals: List[str]
+    goals: List[str] = []
     profiles: Optional[List[str]] = None
     properties: Optional[Dict[str, str]] = None
     skip_tests: Optional[bool] = False
+    # Return a stored result when the sources and options match an earlier successful run
+    use_cache: bool = True
+    # Reactor selection (-pl, -am, -amd) and build threads (-T)
+    projects: Optional[List[str]] = None
+    also_make: bool = False
+    also_make_dependents: bool = False
+    threads: Optional[str] = None
+    # Run with -o; None goes offline when the project's dependencies were prefetched and no tests run
+    offline: Optional[bool] = None
+    # -Dmaven.repo.local; None uses the shared repository once the project was prefetched
+    local_repository: Optional[str] = None
+
+class SkippedModule(BaseModel):
+    module: str
+    id: str
+    reason: str
+
+class ModuleSelection(BaseModel):
+    full_build: bool
+    reason: str
+    changed: List[str]
+    dependents: List[str]
+    upstream: List[str]
+    skipped: List[SkippedModule]
+    ignored_files: List[str]
+    projects: Optional[List[str]] = None
+
+class SelectiveBuildRequest(MavenRequest):
+    # Files changed since the last build, absolute or relative to project_path
+    changed_files: List[str]
+    step: MavenStep = MavenStep.BUILD
+    # Unchanged upstream modules are built too unless they are already installed
+    also_make: bool = True
+
+class PipelineRequest(MavenRequest):
+    # Last lifecycle phase to run: compile, test, package, verify or install
+    phase: str = "install"
+    clean: bool = True
+
+class ShardedTestRequest(MavenRequest):
+    # Concurrent Surefire runs; defaults to MAVEN_TEST_SHARDS
+    shards: Optional[int] = None
+
+class ImpactedTestRequest(MavenRequest):
+    changed_files: List[str]
+    # Run every test instead of only those impacted by the changes
+    full_suite: bool = False
+
+class TestSelection(BaseModel):
+    full_suite: bool
+    reason: str
+    changed_classes: List[str]
+    tests: List[str]
+    ignored_files: List[str]
 
 class MavenResponse(BaseModel):
     success: bool
@@ -22,9 +294,92 @@ class MavenResponse(BaseModel):
     errors: Optional[List[str]] = None
     test_results: Optional[Dict] = None
     build_artifacts: Optional[List[str]] = None
+    cached: Optional[bool] = None
+    # Full output and errors when they were too large to return inline (see /artifacts)
+    output_artifact: Optional[str] = None
+    errors_artifact: Optional[str] = None
+    module_selection: Optional[ModuleSelection] = None
+    test_selection: Optional[TestSelection] = None
+
+class PipelineResponse(BaseModel):
+    success: bool
+    message: str
+    phase: str
+    compile: Optional[MavenResponse] = None
+    test: Optional[MavenResponse] = None
+    build: Optional[MavenResponse] = None
+
+class ArtifactInfo(BaseModel):
+    id: str
+    step: str
+    project_path: str
+    stream: str
+    created_at: float
+    lines: int
+    bytes: int
+    compressed_bytes: int
+
+class ArtifactLines(BaseModel):
+    start: int
+    lines: List[str]
+
+class ArtifactSearchResult(BaseModel):
+    matches: List[Dict]
+    truncated: bool
+
+class TestReportRequest(BaseModel):
+    project_path: str
+    # Only reports written at or after this Unix timestamp
+    since: Optional[float] = None
+
+class PrefetchRequest(BaseModel):
+    project_paths: List[str]
+    # Maven-layout directory to copy from; defaults to MAVEN_MIRROR_DIR
+    mirror: Optional[str] = None
+    # Defaults to MAVEN_SHARED_REPOSITORY
+    local_repository: Optional[str] = None
+
+class PrefetchResponse(BaseModel):
+    success: bool
+    message: str
+    repository: str
+    requested: int
+    artifacts: int
+    copied_files: int
+    copied_bytes: int
+    missing: List[str]
+    unresolved: List[str]
+    offline_projects: List[str]
+
+class DaemonStatus(BaseModel):
+    backend: str
+    available: bool
+    output: Optional[str] = None
+
+class JobRequest(MavenRequest):
+    step: MavenStep
+    # Higher priorities start first; equal priorities run in submission order
+    priority: int = 0
+
+class JobInfo(BaseModel):
+    id: str
+    step: MavenStep
+    project_path: str
+    status: JobStatus
+    priority: int
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    queue_position: Optional[int] = None
+    result: Optional[MavenResponse] = None
 
 def parse_test_results(output: str) -> Dict:
-    """Parse Maven test output to extract test results"""
+    """Parse Maven test output to extract test results
+
+    Only used when no Surefire/Failsafe XML reports are available. Per-module
+    "Results:" summaries are summed; per-class lines carry a "Time elapsed"
+    suffix and are skipped.
+    """
     results = {
         "tests": 0,
         "failures": 0,
@@ -34,132 +389,1810 @@ def parse_test_results(output: str) -> Dict:
     }
     
     # Extract test summary
-    test_summary = re.search(r'Tests run: (\d+), Failures: (\d+), Errors: (\d+), Skipped: (\d+)', output)
-    if test_summary:
-        results["tests"] = int(test_summary.group(1))
-        results["failures"] = int(test_summary.group(2))
-        results["errors"] = int(test_summary.group(3))
-        results["skipped"] = int(test_summary.group(4))
+    for test_summary in _TEST_SUMMARY.finditer(output):
+        results["tests"] += int(test_summary.group(1))
+        results["failures"] += int(test_summary.group(2))
+        results["errors"] += int(test_summary.group(3))
+        results["skipped"] += int(test_summary.group(4))
     
     # Extract failed tests
-    for line in output.split('\n'):
-        if line.startswith('Failed tests:'):
-            failed_tests_section = True
-            continue
-        if failed_tests_section and line.strip() and not line.startswith('Tests '):
-            results["failed_tests"].append(line.strip())
+    for section in _FAILED_TESTS_SECTION.finditer(output):
+        for line in section.group(1).splitlines():
+            line = line.replace("[ERROR]", "", 1).strip()
+            if line:
+                results["failed_tests"].append(line)
     
     return results
 
-@app.post("/compile", response_model=MavenResponse)
-async def compile_project(request: MavenRequest):
-    """Compile the Maven project"""
-    try:
-        cmd = ["mvn", "compile"]
-        if request.profiles:
-            cmd.extend(["-P", ",".join(request.profiles)])
-        if request.properties:
-            for key, value in request.properties.items():
-                cmd.append(f"-D{key}={value}")
-        
-        result = subprocess.run(cmd, cwd=request.project_path, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            return MavenResponse(
-                success=True,
-                message="Project compiled successfully",
-                output=result.stdout
+def get_report_pool() -> ProcessPoolExecutor:
+    """Create the report parsing process pool on first use"""
+    global _report_pool
+    if _report_pool is None:
+        _report_pool = ProcessPoolExecutor(max_workers=REPORT_WORKERS)
+    return _report_pool
+
+def find_test_reports(project_path: str, since: Optional[float] = None) -> List[str]:
+    """Find TEST-*.xml Surefire/Failsafe reports in every module's target directory
+
+    With since set, reports last written before that time (stale results
+    from earlier runs) are ignored.
+    """
+    reports = []
+    for root, dirs, _ in os.walk(project_path):
+        if "target" in dirs:
+            for report_dir in TEST_REPORT_DIRS:
+                report_path = os.path.join(root, "target", report_dir)
+                if not os.path.isdir(report_path):
+                    continue
+                for entry in os.scandir(report_path):
+                    if not (entry.name.startswith("TEST-") and entry.name.endswith(".xml")):
+                        continue
+                    if since is None or entry.stat().st_mtime >= since:
+                        reports.append(entry.path)
+        dirs[:] = [d for d in dirs if d not in REPORT_SCAN_SKIP_DIRS]
+    return reports
+
+def parse_test_report(report_path: str) -> Dict:
+    """Stream one JUnit XML report, keeping counts, per-class time and failure details"""
+    suite = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0, "classes": {}, "failed": []}
+    case = None
+    for event, elem in ET.iterparse(report_path, events=("start", "end")):
+        if event == "start":
+            if elem.tag == "testcase":
+                case = {"class": elem.get("classname") or "", "name": elem.get("name") or ""}
+            continue
+
+        if elem.tag in ("failure", "error") and case is not None:
+            case["kind"] = elem.tag
+            case["type"] = elem.get("type")
+            case["message"] = elem.get("message")
+            case["stack_trace"] = (elem.text or "").strip()[:MAX_STACK_TRACE_CHARS]
+        elif elem.tag == "skipped" and case is not None:
+            case["kind"] = "skipped"
+        elif elem.tag == "testcase" and case is not None:
+            stats = suite["classes"].setdefault(
+                case["class"], {"tests": 0, "failures": 0, "errors": 0, "skipped": 0, "time": 0.0}
             )
+            stats["tests"] += 1
+            stats["time"] += float(elem.get("time") or 0)
+            kind = case.get("kind")
+            if kind == "failure":
+                stats["failures"] += 1
+            elif kind == "error":
+                stats["errors"] += 1
+            elif kind == "skipped":
+                stats["skipped"] += 1
+            if kind in ("failure", "error"):
+                suite["failed"].append(case)
+            case = None
+        # Drop finished elements (captured stdout can be large) but keep the root
+        if elem.tag != "testsuite":
+            elem.clear()
+
+    for stats in suite["classes"].values():
+        for key in ("tests", "failures", "errors", "skipped"):
+            suite[key] += stats[key]
+    return suite
+
+def parse_report_chunk(report_paths: List[str]) -> List[Dict]:
+    """Parse a chunk of reports inside a worker process, skipping unreadable files"""
+    suites = []
+    for report_path in report_paths:
+        try:
+            suites.append(parse_test_report(report_path))
+        except (OSError, ET.ParseError):
+            continue
+    return suites
+
+async def collect_test_reports(project_path: str, since: Optional[float] = None) -> Optional[Dict]:
+    """Aggregate the project's test reports into a test_results dict, or None if there are none"""
+    report_paths = await run_in_threadpool(find_test_reports, project_path, since)
+    if not report_paths:
+        return None
+
+    chunk_size = 32
+    chunks = [report_paths[i:i + chunk_size] for i in range(0, len(report_paths), chunk_size)]
+    loop = asyncio.get_running_loop()
+    parsed = await asyncio.gather(*[
+        loop.run_in_executor(get_report_pool(), parse_report_chunk, chunk) for chunk in chunks
+    ])
+
+    results = {
+        "tests": 0,
+        "failures": 0,
+        "errors": 0,
+        "skipped": 0,
+        "failed_tests": [],
+        "time": 0.0,
+        "reports": len(report_paths),
+        "classes": [],
+        "failure_details": []
+    }
+    classes: Dict[str, Dict] = {}
+    for suite in (suite for chunk in parsed for suite in chunk):
+        for key in ("tests", "failures", "errors", "skipped"):
+            results[key] += suite[key]
+        for name, stats in suite["classes"].items():
+            # Surefire and Failsafe may both report the same class
+            merged = classes.setdefault(name, {"tests": 0, "failures": 0, "errors": 0, "skipped": 0, "time": 0.0})
+            for key, value in stats.items():
+                merged[key] += value
+        for case in suite["failed"]:
+            results["failed_tests"].append(f"{case['class']}.{case['name']}")
+            results["failure_details"].append(case)
+
+    results["classes"] = sorted(
+        ({"name": name, **stats, "time": round(stats["time"], 3)} for name, stats in classes.items()),
+        key=lambda stats: stats["time"],
+        reverse=True
+    )
+    results["time"] = round(sum(stats["time"] for stats in classes.values()), 3)
+    return results
+
+def find_test_classes(project_path: str) -> List[str]:
+    """List the fully qualified test classes Surefire would run in every module's src/test/java"""
+    classes = set()
+    for root, dirs, _ in os.walk(project_path):
+        test_root = os.path.join(root, "src", "test", "java")
+        if os.path.isdir(test_root):
+            for source_root, _, files in os.walk(test_root):
+                package = os.path.relpath(source_root, test_root).replace(os.sep, ".")
+                for name in files:
+                    if _TEST_CLASS_FILE.match(name):
+                        classes.add(name[:-5] if package == "." else f"{package}.{name[:-5]}")
+        dirs[:] = [d for d in dirs if d not in REPORT_SCAN_SKIP_DIRS]
+    return sorted(classes)
+
+def partition_tests(classes: List[str], timings: Dict[str, float], shards: int) -> List[Tuple[float, List[str]]]:
+    """Split test classes into at most shards groups of similar total time, as (estimated time, classes)
+
+    Classes are placed longest first on the least loaded shard. Classes
+    without a recorded time are assumed to take the average known time.
+    """
+    known = [timings[name] for name in classes if name in timings]
+    default = sum(known) / len(known) if known else 1.0
+    loads = [(0.0, index) for index in range(max(1, min(shards, len(classes))))]
+    groups: List[List[str]] = [[] for _ in loads]
+    for name in sorted(classes, key=lambda name: (-timings.get(name, default), name)):
+        load, index = heapq.heappop(loads)
+        groups[index].append(name)
+        heapq.heappush(loads, (load + timings.get(name, default), index))
+    estimates = {index: load for load, index in loads}
+    return [(round(estimates[index], 3), group) for index, group in enumerate(groups) if group]
+
+def copy_project(project_path: str, copy_dir: str):
+    """Copy a project for one test shard, keeping mtimes so Maven finds the compiled classes up to date
+
+    The compiler plugin records absolute source paths under
+    target/maven-status; they are rewritten to the copy so it does not
+    see every file as new and recompile.
+    """
+    project_path = os.path.abspath(project_path)
+    shutil.copytree(
+        project_path, copy_dir, symlinks=True, dirs_exist_ok=True,
+        ignore=lambda _, names: [name for name in names if name in SHARD_COPY_SKIP_DIRS]
+    )
+    for root, dirs, _ in os.walk(copy_dir):
+        status_dir = os.path.join(root, "target", "maven-status")
+        for directory, _, files in os.walk(status_dir):
+            for name in files:
+                if not name.endswith(".lst"):
+                    continue
+                list_path = os.path.join(directory, name)
+                with open(list_path, 'r', encoding='utf-8', errors='replace') as f:
+                    content = f.read()
+                with open(list_path, 'w', encoding='utf-8') as f:
+                    f.write(content.replace(project_path + os.sep, copy_dir + os.sep))
+        dirs[:] = [d for d in dirs if d not in REPORT_SCAN_SKIP_DIRS]
+
+def copy_shard_reports(copy_dir: str, project_path: str, since: float):
+    """Copy the reports a shard wrote back into the same module of the original project"""
+    for report_path in find_test_reports(copy_dir, since=since):
+        target = os.path.join(project_path, os.path.relpath(report_path, copy_dir))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(report_path, target)
+
+def _top_level_class(internal_name: str) -> str:
+    return internal_name.replace("/", ".").split("$")[0]
+
+def parse_class_references(class_path: str) -> Dict:
+    """Read a .class file's constant pool, returning the top-level classes it references
+
+    References come from class entries plus the field, method, signature and
+    annotation descriptors, so types used only in signatures are included.
+    """
+    with open(class_path, 'rb') as f:
+        data = f.read()
+    if data[:4] != b"\xca\xfe\xba\xbe":
+        raise ValueError(f"Not a class file: {class_path}")
+
+    count = int.from_bytes(data[8:10], "big")
+    utf8: Dict[int, str] = {}
+    class_entries: List[int] = []
+    offset = 10
+    index = 1
+    while index < count:
+        tag = data[offset]
+        offset += 1
+        if tag == 1:
+            length = int.from_bytes(data[offset:offset + 2], "big")
+            utf8[index] = data[offset + 2:offset + 2 + length].decode('utf-8', errors='replace')
+            offset += 2 + length
+        elif tag == 7:
+            class_entries.append(int.from_bytes(data[offset:offset + 2], "big"))
+            offset += 2
+        elif tag in (8, 16, 19, 20):
+            offset += 2
+        elif tag == 15:
+            offset += 3
+        elif tag in (3, 4, 9, 10, 11, 12, 17, 18):
+            offset += 4
+        elif tag in (5, 6):
+            # Longs and doubles take two constant pool slots
+            offset += 8
+            index += 1
         else:
-            return MavenResponse(
-                success=False,
-                message="Compilation failed",
-                errors=[result.stderr]
+            raise ValueError(f"Unknown constant pool tag {tag} in {class_path}")
+        index += 1
+
+    references = set()
+    for name_index in class_entries:
+        name = utf8.get(name_index, "")
+        if name.startswith("["):
+            continue
+        references.add(_top_level_class(name))
+    for value in utf8.values():
+        for match in _DESCRIPTOR_CLASS.finditer(value):
+            references.add(_top_level_class(match.group(1)))
+    return {"references": sorted(name for name in references if name and not name.startswith("java."))}
+
+def parse_source_references(source_path: str) -> Dict:
+    """Collect a Java source's imports and capitalised identifiers, for classes without bytecode
+
+    The package and imports come from the file parser's header lexer;
+    identifiers are the lexer's tokens, so comments and strings are skipped.
+    """
+    with open(source_path, 'r', encoding='utf-8', errors='replace') as f:
+        source = f.read()
+    header = scan_java_header(source)
+    return {
+        "package": header["package_name"],
+        "imports": sorted(set(header["imports"] + header["static_imports"])),
+        "identifiers": sorted({name for name in java_identifiers(source) if name[0].isupper()})
+    }
+
+def maven_command(request: MavenRequest, goals: List[str], skip_tests: bool = False) -> List[str]:
+    """Build the mvn command line for a request"""
+    cmd = [MAVEN_EXECUTABLE] + goals
+    if skip_tests:
+        cmd.append("-DskipTests")
+    if request.profiles:
+        cmd.extend(["-P", ",".join(request.profiles)])
+    if request.properties:
+        for key, value in request.properties.items():
+            cmd.append(f"-D{key}={value}")
+    if request.projects:
+        cmd.extend(["-pl", ",".join(request.projects)])
+    if request.also_make:
+        cmd.append("-am")
+    if request.also_make_dependents:
+        cmd.append("-amd")
+    if request.threads:
+        cmd.extend(["-T", request.threads])
+    cmd.extend(repository_options(request, goals, skip_tests))
+    return cmd
+
+def signal_process_tree(process: asyncio.subprocess.Process, sig: int):
+    """Signal Maven and every JVM it forked (the process leads its own session)"""
+    try:
+        os.killpg(process.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+async def kill_process_tree(process: asyncio.subprocess.Process):
+    """Stop a Maven run, giving it MAVEN_KILL_GRACE seconds to shut down cleanly
+
+    The mvnd client only cancels the build in its daemon on SIGTERM, so a
+    SIGKILL comes last and also takes out any forked JVM left behind.
+    """
+    signal_process_tree(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), timeout=MAVEN_KILL_GRACE)
+    except asyncio.TimeoutError:
+        pass
+    signal_process_tree(process, signal.SIGKILL)
+    await process.wait()
+
+async def run_maven(cmd: List[str], cwd: str, on_output: Optional[OutputCallback] = None) -> Tuple[int, str, str]:
+    """Run Maven without blocking the event loop, returning (returncode, stdout, stderr)
+
+    Each output line is passed to on_output(stream, line) as it arrives.
+    Cancelling the coroutine kills the whole process tree.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=MAVEN_LINE_LIMIT,
+        start_new_session=True
+    )
+
+    async def pump(stream: asyncio.StreamReader, name: str, lines: List[str]):
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # Line longer than the buffer limit; asyncio drops it and carries on
+                continue
+            if not line:
+                break
+            line = line.decode('utf-8', errors='replace')
+            lines.append(line)
+            if on_output is not None:
+                await on_output(name, line)
+
+    stdout: List[str] = []
+    stderr: List[str] = []
+    try:
+        await asyncio.gather(pump(process.stdout, "stdout", stdout), pump(process.stderr, "stderr", stderr))
+        returncode = await process.wait()
+    except BaseException:
+        await kill_process_tree(process)
+        raise
+    return returncode, "".join(stdout), "".join(stderr)
+
+def mvnd_available() -> bool:
+    return MAVEN_BACKEND != "mvn" and not _mvnd_failed and shutil.which(MVND_EXECUTABLE) is not None
+
+async def run_maven_backend(cmd: List[str], cwd: str, on_output: Optional[OutputCallback] = None) -> Tuple[int, str, str]:
+    """Run a mvn command line on the warm mvnd daemons when available, otherwise with plain mvn"""
+    global _mvnd_failed
+    # Checked up front so a bad project path is not mistaken for a broken mvnd
+    if not os.path.isdir(cwd):
+        raise FileNotFoundError(f"Project directory not found: {cwd}")
+    if MAVEN_BACKEND == "mvnd" or mvnd_available():
+        try:
+            return await run_maven([MVND_EXECUTABLE] + MVND_OPTIONS + cmd[1:], cwd, on_output)
+        except OSError as e:
+            if MAVEN_BACKEND == "mvnd" or e.filename != MVND_EXECUTABLE:
+                raise
+            # The client itself could not be started; stop trying until the server restarts
+            _mvnd_failed = True
+    return await run_maven(cmd, cwd, on_output)
+
+def find_build_artifacts(project_path: str) -> List[str]:
+    """List the jar and war files in the project's target directory"""
+    target_dir = os.path.join(project_path, "target")
+    artifacts = []
+    if os.path.exists(target_dir):
+        for file in os.listdir(target_dir):
+            if file.endswith(".jar") or file.endswith(".war"):
+                artifacts.append(os.path.join("target", file))
+    return artifacts
+
+def maven_response(step: MavenStep, request: MavenRequest, returncode: int, stdout: str, stderr: str,
+                   test_results: Optional[Dict] = None) -> MavenResponse:
+    """Turn the outcome of a Maven run into the step's response"""
+    spec = MAVEN_GOALS[step]
+    extra = {}
+    if step == MavenStep.TEST:
+        extra["test_results"] = test_results or parse_test_results(stdout)
+    elif test_results:
+        extra["test_results"] = test_results
+    if returncode == 0:
+        if step == MavenStep.BUILD:
+            extra["build_artifacts"] = find_build_artifacts(request.project_path)
+        return MavenResponse(success=True, message=spec["success"], output=stdout, **extra)
+    return MavenResponse(success=False, message=spec["failure"], errors=[stderr], **extra)
+
+def source_tree_digest(project_path: str) -> str:
+    """Hash every file under the project except build output, using the shared stat memo"""
+    excluded = set(BUILD_CACHE_EXCLUDE_DIRS)
+    digest = hashlib.blake2b(digest_size=20)
+    for root, dirs, filenames in os.walk(project_path):
+        dirs[:] = sorted(d for d in dirs if d not in excluded)
+        for filename in sorted(filenames):
+            file_path = os.path.join(root, filename)
+            try:
+                file_hash = file_digest(file_path)
+            except OSError:
+                continue
+            digest.update(os.path.relpath(file_path, project_path).encode('utf-8'))
+            digest.update(b"\0" + file_hash.encode('ascii') + b"\n")
+    return digest.hexdigest()
+
+def build_cache_key(step: MavenStep, request: MavenRequest) -> str:
+    """Key a run by the source tree (POMs included) and everything that shapes the mvn command line"""
+    spec = MAVEN_GOALS[step]
+    inputs = {
+        "tree": source_tree_digest(request.project_path),
+        "step": step.value,
+        # Arguments only, so switching between mvn and mvnd keeps the cached results
+        "arguments": maven_command(
+            request, spec["goals"] or request.goals, spec["skip_tests"] and bool(request.skip_tests)
+        )[1:]
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+class BuildCache:
+    """Disk-backed LRU of successful MavenResponses keyed by build_cache_key"""
+
+    def __init__(self, path: str = MAVEN_BUILD_CACHE_PATH, max_bytes: int = MAVEN_BUILD_CACHE_MAX_BYTES):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS builds ("
+            "key TEXT PRIMARY KEY, project_path TEXT, response TEXT, size INTEGER, accessed REAL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS builds_accessed ON builds (accessed)")
+
+    def get(self, key: str, project_path: str) -> Optional[MavenResponse]:
+        with self.lock:
+            row = self.connection.execute("SELECT response FROM builds WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return None
+            response = MavenResponse.model_validate_json(row[0])
+            # A cleaned target directory means the build has to run again
+            artifacts = response.build_artifacts or []
+            if not all(os.path.exists(os.path.join(project_path, artifact)) for artifact in artifacts):
+                self.connection.execute("DELETE FROM builds WHERE key = ?", (key,))
+                return None
+            self.connection.execute("UPDATE builds SET accessed = ? WHERE key = ?", (time.time(), key))
+        return response.model_copy(update={"cached": True})
+
+    def put(self, key: str, project_path: str, response: MavenResponse):
+        data = response.model_dump_json()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO builds (key, project_path, response, size, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, project_path, data, len(data), time.time())
             )
+            total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM builds").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            # Least recently used first, until back under the budget
+            stale = []
+            for stale_key, size in self.connection.execute("SELECT key, size FROM builds ORDER BY accessed"):
+                if total <= self.max_bytes:
+                    break
+                stale.append((stale_key,))
+                total -= size
+            self.connection.executemany("DELETE FROM builds WHERE key = ?", stale)
+
+_build_cache: Optional[BuildCache] = None
+
+def get_build_cache() -> BuildCache:
+    global _build_cache
+    if _build_cache is None:
+        _build_cache = BuildCache()
+    return _build_cache
+
+async def cached_build_key(step: MavenStep, request: MavenRequest) -> Optional[str]:
+    """Cache key for a request, or None when caching is off or the cache cannot be used"""
+    if not request.use_cache:
+        return None
+    try:
+        await run_in_threadpool(get_build_cache)
+        return await run_in_threadpool(build_cache_key, step, request)
+    except (OSError, sqlite3.Error):
+        return None
+
+def _block_lines(data: bytes) -> List[str]:
+    """Split a decompressed block into lines the way write() counted them: on "\n" only
+
+    str.splitlines() would also break on "\r" and other separators that
+    Maven progress output contains, shifting every later line number.
+    """
+    lines = data.decode('utf-8').split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return [line[:-1] if line.endswith("\r") else line for line in lines]
+
+class ArtifactStore:
+    """Gzip-compressed Maven logs that can be read back by line or byte range
+
+    Each log is written as a series of independent gzip members of about
+    ARTIFACT_BLOCK_SIZE bytes, so the file is still a plain .gz while a
+    sidecar index of (first line, byte offset, file offset, length) lets a
+    ranged read decompress only the blocks it touches.
+    """
+
+    def __init__(self, directory: str = MAVEN_ARTIFACT_DIR, retention: int = MAVEN_ARTIFACT_RETENTION):
+        self.directory = directory
+        self.retention = retention
+        self.lock = threading.Lock()
+
+    def _paths(self, artifact_id: str) -> Tuple[str, str]:
+        if not _ARTIFACT_ID.fullmatch(artifact_id):
+            raise KeyError(artifact_id)
+        base = os.path.join(self.directory, artifact_id)
+        return base + ".log.gz", base + ".json"
+
+    def write(self, text: str, meta: Dict) -> str:
+        """Store a log and return its artifact ID"""
+        os.makedirs(self.directory, exist_ok=True)
+        artifact_id = uuid.uuid4().hex
+        log_path, index_path = self._paths(artifact_id)
+
+        blocks = []
+        line_count = 0
+        byte_offset = 0
+        file_offset = 0
+        with open(log_path, 'wb') as f:
+            block: List[str] = []
+            block_size = 0
+            block_first_line = 0
+            for line in io.StringIO(text):
+                block.append(line)
+                block_size += len(line)
+                line_count += 1
+                if block_size >= ARTIFACT_BLOCK_SIZE:
+                    data = "".join(block).encode('utf-8')
+                    compressed = gzip.compress(data)
+                    f.write(compressed)
+                    blocks.append([block_first_line, byte_offset, file_offset, len(compressed)])
+                    byte_offset += len(data)
+                    file_offset += len(compressed)
+                    block, block_size, block_first_line = [], 0, line_count
+            if block:
+                data = "".join(block).encode('utf-8')
+                compressed = gzip.compress(data)
+                f.write(compressed)
+                blocks.append([block_first_line, byte_offset, file_offset, len(compressed)])
+                byte_offset += len(data)
+                file_offset += len(compressed)
+
+        info = {
+            **meta,
+            "id": artifact_id,
+            "created_at": time.time(),
+            "lines": line_count,
+            "bytes": byte_offset,
+            "compressed_bytes": file_offset
+        }
+        with open(index_path, 'w') as f:
+            json.dump({"info": info, "blocks": blocks}, f)
+
+        self.prune()
+        return artifact_id
+
+    def _index(self, artifact_id: str) -> Dict:
+        _, index_path = self._paths(artifact_id)
+        try:
+            with open(index_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(artifact_id)
+
+    def info(self, artifact_id: str) -> Dict:
+        return self._index(artifact_id)["info"]
+
+    def _iter_blocks(self, artifact_id: str, first: int, last: int) -> Iterator[Tuple[List, bytes]]:
+        """Decompress blocks first..last (inclusive) of an artifact"""
+        log_path, _ = self._paths(artifact_id)
+        blocks = self._index(artifact_id)["blocks"]
+        with open(log_path, 'rb') as f:
+            for block in blocks[first:last + 1]:
+                f.seek(block[2])
+                yield block, gzip.decompress(f.read(block[3]))
+
+    def read_lines(self, artifact_id: str, start: int, count: int) -> List[str]:
+        blocks = self._index(artifact_id)["blocks"]
+        if not blocks or count <= 0:
+            return []
+        first = max(0, bisect.bisect_right([block[0] for block in blocks], start) - 1)
+        lines = []
+        for block, data in self._iter_blocks(artifact_id, first, len(blocks) - 1):
+            for number, line in enumerate(_block_lines(data), start=block[0]):
+                if number >= start:
+                    lines.append(line)
+                    if len(lines) >= count:
+                        return lines
+        return lines
+
+    def read_bytes(self, artifact_id: str, offset: int, length: int) -> bytes:
+        blocks = self._index(artifact_id)["blocks"]
+        if not blocks or length <= 0:
+            return b""
+        starts = [block[1] for block in blocks]
+        first = max(0, bisect.bisect_right(starts, offset) - 1)
+        last = max(0, bisect.bisect_right(starts, offset + length - 1) - 1)
+        chunks = []
+        for block, data in self._iter_blocks(artifact_id, first, last):
+            chunks.append(data)
+        data = b"".join(chunks)
+        skip = offset - blocks[first][1]
+        return data[skip:skip + length]
+
+    def search(self, artifact_id: str, pattern: "re.Pattern", max_matches: int) -> Tuple[List[Dict], bool]:
+        """Find lines matching a pattern, returning (matches, truncated)"""
+        blocks = self._index(artifact_id)["blocks"]
+        matches = []
+        for block, data in self._iter_blocks(artifact_id, 0, len(blocks) - 1):
+            for number, line in enumerate(_block_lines(data), start=block[0]):
+                if pattern.search(line):
+                    if len(matches) >= max_matches:
+                        return matches, True
+                    matches.append({"line": number, "text": line})
+        return matches, False
+
+    def prune(self):
+        """Delete the oldest artifacts beyond the retention count"""
+        with self.lock:
+            try:
+                entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")]
+            except FileNotFoundError:
+                return
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:max(0, len(entries) - self.retention)]:
+                base = entry.path[:-len(".json")]
+                for path in (entry.path, base + ".log.gz"):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+artifacts = ArtifactStore()
+
+def output_excerpt(text: str, artifact_id: str) -> str:
+    """First and last lines of a spilled log with a pointer to the full artifact"""
+    head_end = 0
+    for _ in range(MAVEN_OUTPUT_HEAD_LINES):
+        newline = text.find("\n", head_end)
+        if newline < 0:
+            head_end = len(text)
+            break
+        head_end = newline + 1
+    tail_start = len(text)
+    for _ in range(MAVEN_OUTPUT_TAIL_LINES):
+        newline = text.rfind("\n", head_end, tail_start - 1)
+        if newline < 0:
+            tail_start = head_end
+            break
+        tail_start = newline + 1
+
+    omitted = text.count("\n", head_end, tail_start)
+    marker = f"... {omitted} lines omitted, full output in artifact {artifact_id} ...\n"
+    # Keep the excerpt bounded even when individual lines are huge
+    half = MAVEN_OUTPUT_INLINE_LIMIT // 2
+    return text[:min(head_end, half)] + marker + text[max(tail_start, len(text) - half):]
+
+def spill_output(step: MavenStep, request: MavenRequest, response: MavenResponse) -> MavenResponse:
+    """Move output and errors over MAVEN_OUTPUT_INLINE_LIMIT into the artifact store"""
+    update = {}
+    meta = {"step": step.value, "project_path": request.project_path}
+    if response.output and len(response.output) > MAVEN_OUTPUT_INLINE_LIMIT:
+        artifact_id = artifacts.write(response.output, {**meta, "stream": "stdout"})
+        update["output"] = output_excerpt(response.output, artifact_id)
+        update["output_artifact"] = artifact_id
+    if response.errors and sum(len(error) for error in response.errors) > MAVEN_OUTPUT_INLINE_LIMIT:
+        errors = "".join(response.errors)
+        artifact_id = artifacts.write(errors, {**meta, "stream": "stderr"})
+        update["errors"] = [output_excerpt(errors, artifact_id)]
+        update["errors_artifact"] = artifact_id
+    return response.model_copy(update=update) if update else response
+
+async def execute_maven(step: MavenStep, request: MavenRequest, on_output: Optional[OutputCallback] = None) -> MavenResponse:
+    """Run one of the MAVEN_GOALS steps for a request"""
+    spec = MAVEN_GOALS[step]
+    try:
+        cache_key = await cached_build_key(step, request)
+        if cache_key is not None:
+            cached = await run_in_threadpool(get_build_cache().get, cache_key, request.project_path)
+            if cached is not None:
+                return cached
+
+        skip_tests = spec["skip_tests"] and bool(request.skip_tests)
+        cmd = maven_command(request, spec["goals"] or request.goals, skip_tests=skip_tests)
+        # Allow for coarse filesystem timestamps when telling this run's reports from older ones
+        started = time.time() - 1
+        returncode, stdout, stderr = await run_maven_backend(cmd, request.project_path, on_output)
+        test_results = None
+        if spec["reports"] and not skip_tests:
+            test_results = await collect_test_reports(request.project_path, since=started)
+        response = maven_response(step, request, returncode, stdout, stderr, test_results)
+        if spec["spill"]:
+            response = await run_in_threadpool(spill_output, step, request, response)
+
+        # Only store the result if the sources did not change while Maven was running
+        if response.success and cache_key is not None and cache_key == await cached_build_key(step, request):
+            await run_in_threadpool(get_build_cache().put, cache_key, request.project_path, response)
+        return response
     except Exception as e:
         return MavenResponse(
             success=False,
-            message=f"Compilation failed: {str(e)}",
+            message=f"{spec['failure']}: {str(e)}",
             errors=[str(e)]
         )
 
+def read_reactor(project_path: str) -> Dict[str, Dict]:
+    """Map each reactor module's directory (relative, "." for the root) to its id, POM and in-reactor dependencies
+
+    Modules come from the shared reactor model, so ids and dependency
+    coordinates are interpolated. A module's parent counts as a
+    dependency, as it does for Maven's -amd.
+    """
+    modules = reactor_modules(project_path, LOCAL_REPOSITORY)
+    by_id = {module["id"]: module["path"] for module in modules}
+    return {
+        module["path"]: {
+            "id": module["id"],
+            "pom_path": module["pom_path"],
+            "depends_on": sorted(by_id[dependency] for dependency in module["depends_on"])
+        }
+        for module in modules
+    }
+
+def _resolvable(coordinate: str) -> bool:
+    version = coordinate.rsplit(":", 1)[-1]
+    return bool(version) and "${" not in coordinate and version[0] not in "[("
+
+def pom_requirements(mirror: str, model: Dict) -> List[str]:
+    """Parent and imported BOM POMs an effective model was built from, which Maven needs in the local repository too"""
+    coordinates = [repository_coordinate(mirror, path) for path in model["required_poms"]]
+    return [coordinate for coordinate in coordinates if coordinate] + model["missing_poms"]
+
+def build_plugins(model: Dict) -> List[Dict]:
+    """Plugins a module's build uses: its declared plugins plus the default lifecycle plugins
+
+    Each default takes the version and dependencies the module's
+    pluginManagement gives it, falling back to MAVEN_PREFETCH_PLUGINS.
+    """
+    managed = {f"{plugin['groupId']}:{plugin['artifactId']}": plugin for plugin in model["plugin_management"]}
+    plugins = {}
+    for coordinate in MAVEN_PREFETCH_PLUGINS:
+        group, artifact, version = coordinate.split(":")
+        key = f"{group}:{artifact}"
+        managed_plugin = managed.get(key) or {"version": None, "dependencies": []}
+        plugins[key] = {
+            "groupId": group,
+            "artifactId": artifact,
+            "version": managed_plugin["version"] or version,
+            "dependencies": managed_plugin["dependencies"]
+        }
+    for plugin in model["plugins"]:
+        key = f"{plugin['groupId']}:{plugin['artifactId']}"
+        if not plugin["version"] and key in plugins:
+            plugin = {**plugin, "version": plugins[key]["version"]}
+        plugins[key] = plugin
+    return list(plugins.values())
+
+def mirror_model(mirror: str, coordinate: str) -> Optional[Dict]:
+    """Effective model of a coordinate's POM in the mirror, or None if it is missing or unreadable"""
+    group, artifact, version = coordinate.split(":")
+    pom_path = repository_pom_path(mirror, group, artifact, version)
+    if not os.path.isfile(pom_path):
+        return None
+    try:
+        return effective_pom(pom_path, mirror)
+    except (OSError, ET.ParseError):
+        return None
+
+def copy_artifact(mirror: str, repository: str, coordinate: str) -> Optional[Tuple[int, int]]:
+    """Copy one version directory (and the artifact and group metadata) from the mirror
+
+    Returns (files copied, bytes copied), or None if the mirror does not have
+    the version. Files already present with the same size are left alone,
+    and each copy is renamed into place so parallel copies never expose a
+    partial file.
+    """
+    group, artifact, version = coordinate.split(":")
+    artifact_dir = os.path.join(*group.split("."), artifact)
+    if not os.path.isdir(os.path.join(mirror, artifact_dir, version)):
+        return None
+
+    files = size = 0
+    for rel_dir, prefix in ((os.path.join(artifact_dir, version), ""),
+                            (artifact_dir, "maven-metadata"),
+                            (os.path.dirname(artifact_dir), "maven-metadata")):
+        source_dir = os.path.join(mirror, rel_dir)
+        if not os.path.isdir(source_dir):
+            continue
+        target_dir = os.path.join(repository, rel_dir)
+        os.makedirs(target_dir, exist_ok=True)
+        for entry in os.scandir(source_dir):
+            if (not entry.is_file() or not entry.name.startswith(prefix)
+                    or entry.name in PREFETCH_SKIP_FILES or entry.name.endswith(".lastUpdated")):
+                continue
+            target = os.path.join(target_dir, entry.name)
+            entry_size = entry.stat().st_size
+            if os.path.isfile(target) and os.path.getsize(target) == entry_size:
+                continue
+            partial = f"{target}.{uuid.uuid4().hex}.part"
+            shutil.copyfile(entry.path, partial)
+            os.replace(partial, target)
+            files += 1
+            size += entry_size
+    return files, size
+
+def fetch_artifact(mirror: str, repository: str, coordinate: str) -> Tuple[Optional[Tuple[int, int]], Optional[Dict]]:
+    """Copy one artifact and read its effective model from the mirror; (None, None) if the mirror lacks it"""
+    copied = copy_artifact(mirror, repository, coordinate)
+    if copied is None:
+        return None, None
+    return copied, mirror_model(mirror, coordinate)
+
+def runtime_dependencies(model: Dict, managed: Dict[str, str]) -> List[str]:
+    """Compile and runtime dependencies Maven follows from an artifact, at the versions the project manages"""
+    coordinates = []
+    for dep in model["dependencies"]:
+        if (dep["scope"] or "compile") not in ("compile", "runtime") or dep["optional"] == "true":
+            continue
+        key = f"{dep['groupId']}:{dep['artifactId']}"
+        coordinates.append(f"{key}:{managed.get(key) or dep['version'] or ''}")
+    return coordinates
+
+def reactor_pom_digest(project_path: str) -> str:
+    """Hash of every reactor POM, used to tell whether a prefetch still matches the project"""
+    digest = hashlib.blake2b(digest_size=20)
+    for rel, module in sorted(read_reactor(project_path).items()):
+        digest.update(rel.encode())
+        digest.update(file_digest(module["pom_path"]).encode())
+    return digest.hexdigest()
+
+def prefetch_dependencies(project_paths: List[str], mirror: str, repository: str) -> PrefetchResponse:
+    """Copy the dependencies and plugins of every project's reactor, deduplicated, from the mirror in parallel
+
+    Project dependencies of every scope are fetched; beyond them only
+    compile and runtime dependencies are followed, as Maven does, with
+    versions overridden by the module's dependencyManagement. Each module
+    walks its own graph, but an artifact is copied and read once.
+    Lifecycle plugins are fetched at the versions the module's
+    pluginManagement picks. Projects whose whole graph was resolved are
+    recorded as prefetched, so later runs that do not run tests go
+    offline against the shared repository until one of their POMs changes.
+    """
+    # A context is the project and the managed versions that apply while walking from a module
+    contexts: List[Tuple[str, Dict[str, str]]] = []
+    context_ids: Dict[Tuple, int] = {}
+    roots: List[Tuple[int, str]] = []
+    reactor_ids = set()
+
+    def context(project_path: str, managed: Dict[str, str]) -> int:
+        key = (project_path, tuple(sorted(managed.items())))
+        if key not in context_ids:
+            context_ids[key] = len(contexts)
+            contexts.append((project_path, managed))
+        return context_ids[key]
+
+    for project_path in project_paths:
+        # Plugins, parents and BOMs are resolved without the project's dependencyManagement
+        unmanaged = context(project_path, {})
+        for module in reactor_modules(project_path, mirror):
+            model = effective_pom(module["pom_path"], mirror)
+            reactor_ids.add(pom_coordinate(model))
+            managed = context(project_path, {
+                f"{dep['groupId']}:{dep['artifactId']}": dep["version"]
+                for dep in model["dependency_management"] if dep["scope"] != "import" and dep["version"]
+            })
+            roots.extend((unmanaged, coordinate) for coordinate in pom_requirements(mirror, model))
+            roots.extend((managed, pom_coordinate(dep)) for dep in model["dependencies"])
+            for plugin in build_plugins(model):
+                roots.append((unmanaged, pom_coordinate(plugin)))
+                roots.extend((unmanaged, pom_coordinate(dep)) for dep in plugin["dependencies"])
+
+    visited = set()
+    results: Dict[str, Tuple[Optional[Tuple[int, int]], Optional[Dict]]] = {}
+    waiting: Dict[str, List[int]] = {}
+    ready: List[Tuple[int, str]] = []
+    missing = set()
+    unresolved = set()
+    incomplete = set()
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as pool:
+        fetches = {}
+
+        def visit(context_id: int, coordinate: str):
+            if (context_id, coordinate) in visited or coordinate in reactor_ids:
+                return
+            visited.add((context_id, coordinate))
+            if not _resolvable(coordinate):
+                unresolved.add(coordinate)
+                incomplete.add(contexts[context_id][0])
+            elif coordinate in results:
+                ready.append((context_id, coordinate))
+            elif coordinate in waiting:
+                waiting[coordinate].append(context_id)
+            else:
+                waiting[coordinate] = [context_id]
+                fetches[pool.submit(fetch_artifact, mirror, repository, coordinate)] = coordinate
+
+        for context_id, coordinate in roots:
+            visit(context_id, coordinate)
+        while ready or fetches:
+            while ready:
+                context_id, coordinate = ready.pop()
+                project_path, managed = contexts[context_id]
+                copied, model = results[coordinate]
+                if copied is None:
+                    missing.add(coordinate)
+                    incomplete.add(project_path)
+                elif model is None:
+                    # Copied, but its POM is absent or unreadable, so its dependencies are unknown
+                    unresolved.add(coordinate)
+                    incomplete.add(project_path)
+                else:
+                    for required in pom_requirements(mirror, model):
+                        visit(context(project_path, {}), required)
+                    for dependency in runtime_dependencies(model, managed):
+                        visit(context_id, dependency)
+            if fetches:
+                done, _ = wait(fetches, return_when=FIRST_COMPLETED)
+                for future in done:
+                    coordinate = fetches.pop(future)
+                    results[coordinate] = future.result()
+                    ready.extend((context_id, coordinate) for context_id in waiting.pop(coordinate))
+
+    copied_results = [copied for copied, _ in results.values() if copied is not None]
+    complete = [project_path for project_path in project_paths if project_path not in incomplete]
+    with _prefetch_lock:
+        for project_path in project_paths:
+            _prefetched[os.path.abspath(project_path)] = {
+                "repository": repository,
+                "poms": reactor_pom_digest(project_path),
+                "complete": project_path not in incomplete
+            }
+    return PrefetchResponse(
+        success=not incomplete,
+        message="Dependencies prefetched" if not incomplete else "Some dependencies could not be prefetched",
+        repository=repository,
+        requested=len({coordinate for _, coordinate in roots} - reactor_ids),
+        artifacts=len(copied_results),
+        copied_files=sum(files for files, _ in copied_results),
+        copied_bytes=sum(size for _, size in copied_results),
+        missing=sorted(missing),
+        unresolved=sorted(unresolved),
+        offline_projects=sorted(complete)
+    )
+
+def runs_tests(request: MavenRequest, goals: List[str], skip_tests: bool) -> bool:
+    """Whether Maven will run Surefire or Failsafe for these goals"""
+    properties = request.properties or {}
+    if skip_tests or any(properties.get(key) in ("", "true") for key in ("skipTests", "maven.test.skip")):
+        return False
+    return any(
+        goal in SUREFIRE_PHASES or goal.split(":")[0] in ("surefire", "failsafe")
+        or "maven-surefire-plugin" in goal or "maven-failsafe-plugin" in goal
+        for goal in goals
+    )
+
+def repository_settings(request: MavenRequest, goals: List[str], skip_tests: bool = False) -> Tuple[Optional[str], bool]:
+    """Local repository and offline flag for a request running goals
+
+    Prefetched projects use the shared repository, and run offline by
+    default while their POMs are unchanged since a complete prefetch,
+    unless the goals run tests: the Surefire provider is not prefetched.
+    """
+    state = _prefetched.get(os.path.abspath(request.project_path))
+    repository = request.local_repository or (state["repository"] if state else None)
+    offline = request.offline
+    if offline is None:
+        offline = False
+        if (state is not None and state["complete"] and repository == state["repository"]
+                and not runs_tests(request, goals, skip_tests)):
+            try:
+                offline = state["poms"] == reactor_pom_digest(request.project_path)
+            except (OSError, ET.ParseError):
+                offline = False
+    return repository, offline
+
+def repository_options(request: MavenRequest, goals: List[str], skip_tests: bool = False) -> List[str]:
+    """-Dmaven.repo.local and -o for a request running goals"""
+    repository, offline = repository_settings(request, goals, skip_tests)
+    options = [f"-Dmaven.repo.local={repository}"] if repository else []
+    return options + (["-o"] if offline else [])
+
+def _closure(start: set, edges: Dict[str, List[str]]) -> set:
+    seen = set(start)
+    pending = list(start)
+    while pending:
+        for nxt in edges.get(pending.pop(), []):
+            if nxt not in seen:
+                seen.add(nxt)
+                pending.append(nxt)
+    return seen
+
+def _cached_references(path: str, parser: str, parse: Callable[[str], Dict]) -> Optional[Dict]:
+    try:
+        return cached_parse(path, parser, TEST_IMPACT_VERSION, parse)
+    except (OSError, ValueError, IndexError):
+        return None
+
+def build_class_graph(project_path: str) -> Tuple[Dict[str, set], set]:
+    """Map every project class to the classes it references, returning (graph, test classes)
+
+    Compiled classes contribute their constant pool references and sources
+    their imports and same-package identifiers, so classes that have not
+    been compiled yet are still covered. Each file's scan is cached by
+    content in the shared parse cache.
+    """
+    graph: Dict[str, set] = {}
+    sources: Dict[str, Dict] = {}
+    tests = set()
+    test_root = IMPACT_SOURCE_ROOTS[1]
+    for root, dirs, _ in os.walk(project_path):
+        for source_root in IMPACT_SOURCE_ROOTS:
+            base = os.path.join(root, source_root)
+            for directory, _, files in os.walk(base):
+                package = os.path.relpath(directory, base).replace(os.sep, ".")
+                for name in files:
+                    if not name.endswith(".java"):
+                        continue
+                    class_name = name[:-5] if package == "." else f"{package}.{name[:-5]}"
+                    if source_root == test_root and _TEST_CLASS_FILE.match(name):
+                        tests.add(class_name)
+                    parsed = _cached_references(os.path.join(directory, name), "java-references", parse_source_references)
+                    if parsed is not None:
+                        sources[class_name] = parsed
+        for class_root in IMPACT_CLASS_ROOTS:
+            base = os.path.join(root, class_root)
+            for directory, _, files in os.walk(base):
+                for name in files:
+                    if not name.endswith(".class") or name in ("module-info.class", "package-info.class"):
+                        continue
+                    class_path = os.path.join(directory, name)
+                    parsed = _cached_references(class_path, "class-references", parse_class_references)
+                    if parsed is not None:
+                        class_name = _top_level_class(os.path.relpath(class_path, base)[:-6].replace(os.sep, "/"))
+                        graph.setdefault(class_name, set()).update(parsed["references"])
+        dirs[:] = [d for d in dirs if d not in REPORT_SCAN_SKIP_DIRS]
+
+    known = set(graph) | set(sources)
+    by_package: Dict[str, Dict[str, str]] = {}
+    for class_name in known:
+        package, _, simple = class_name.rpartition(".")
+        by_package.setdefault(package, {})[simple] = class_name
+    for class_name, parsed in sources.items():
+        references = graph.setdefault(class_name, set())
+        identifiers = set(parsed["identifiers"])
+        for imported in parsed["imports"]:
+            if imported.endswith(".*"):
+                imported = imported[:-2]
+                references.update(full for simple, full in by_package.get(imported, {}).items() if simple in identifiers)
+                if imported not in known:
+                    continue
+            # Static imports name a member; the class is the longest known prefix
+            resolved = imported
+            while resolved and resolved not in known:
+                resolved = resolved.rpartition(".")[0]
+            references.add(resolved or imported)
+        references.update(
+            full for simple, full in by_package.get(parsed["package"], {}).items() if simple in identifiers
+        )
+    for class_name, references in graph.items():
+        references.discard(class_name)
+    return graph, tests
+
+def select_tests(project_path: str, changed_files: List[str]) -> TestSelection:
+    """Work out which test classes can be affected by a set of changed files"""
+    changed = set()
+    changed_production = False
+    ignored = []
+    full_suite_reason = None
+
+    for file_path in changed_files:
+        rel = os.path.relpath(file_path if os.path.isabs(file_path) else os.path.join(project_path, file_path), project_path)
+        parts = rel.split(os.sep)
+        if rel.startswith("..") or "target" in parts:
+            ignored.append(file_path)
+            continue
+        source_root = next((root for root in IMPACT_SOURCE_ROOTS if os.sep + root + os.sep in os.sep + rel), None)
+        if source_root is not None and rel.endswith(".java"):
+            inner = (os.sep + rel).split(os.sep + source_root + os.sep, 1)[1]
+            changed.add(inner[:-5].replace(os.sep, "."))
+            changed_production = changed_production or source_root == IMPACT_SOURCE_ROOTS[0]
+        elif "src" in parts or parts[-1] == "pom.xml" or parts[0] == ".mvn":
+            # Resources, build configuration and non-Java sources are not tracked per class
+            full_suite_reason = full_suite_reason or f"{rel} changed"
+        else:
+            ignored.append(file_path)
+
+    if full_suite_reason is not None:
+        return TestSelection(
+            full_suite=True,
+            reason=full_suite_reason,
+            changed_classes=sorted(changed),
+            tests=[],
+            ignored_files=ignored
+        )
+
+    graph, tests = build_class_graph(project_path)
+    referrers: Dict[str, List[str]] = {}
+    for class_name, references in graph.items():
+        for reference in references:
+            referrers.setdefault(reference, []).append(class_name)
+    selected = _closure(changed, referrers) & tests
+    if changed_production:
+        selected.update(test for test in tests if graph.get(test, set()) & CONTEXT_TEST_ANNOTATIONS)
+
+    return TestSelection(
+        full_suite=False,
+        reason=f"{len(changed)} changed class(es), {len(selected)} impacted test(s)",
+        changed_classes=sorted(changed),
+        tests=sorted(selected),
+        ignored_files=ignored
+    )
+
+def select_modules(project_path: str, changed_files: List[str], also_make: bool) -> ModuleSelection:
+    """Work out which reactor modules a set of changed files requires rebuilding"""
+    modules = read_reactor(project_path)
+    module_dirs = sorted((rel for rel in modules if rel != "."), key=len, reverse=True)
+    changed = set()
+    ignored = []
+    full_build_reason = None
+
+    for file_path in changed_files:
+        rel = os.path.relpath(file_path if os.path.isabs(file_path) else os.path.join(project_path, file_path), project_path)
+        if rel.startswith(".."):
+            ignored.append(file_path)
+            continue
+        owner = next((d for d in module_dirs if rel == d or rel.startswith(d + os.sep)), ".")
+        inner = rel if owner == "." else os.path.relpath(rel, owner)
+        top = inner.split(os.sep)[0]
+        if top == "target":
+            ignored.append(file_path)
+        elif owner == "." and (inner == "pom.xml" or top == ".mvn"):
+            # The root POM and build config are inherited by every module
+            full_build_reason = f"{inner} changed"
+        elif owner == "." and top != "src":
+            ignored.append(file_path)
+        else:
+            changed.add(owner)
+
+    if full_build_reason is None and len(modules) <= 1 and changed:
+        full_build_reason = "single-module project"
+
+    if full_build_reason is not None:
+        return ModuleSelection(
+            full_build=True,
+            reason=full_build_reason,
+            changed=sorted(changed),
+            dependents=[],
+            upstream=[],
+            skipped=[],
+            ignored_files=ignored
+        )
+
+    dependents_of: Dict[str, List[str]] = {}
+    for rel, module in modules.items():
+        for dependency in module["depends_on"]:
+            dependents_of.setdefault(dependency, []).append(rel)
+    dependents = _closure(changed, dependents_of) - changed
+    upstream = (_closure(changed | dependents, {rel: m["depends_on"] for rel, m in modules.items()})
+                - changed - dependents) if also_make else set()
+
+    skipped = [
+        SkippedModule(module=rel, id=modules[rel]["id"], reason="no changes in the module or its reactor dependencies")
+        for rel in sorted(set(modules) - changed - dependents - upstream)
+    ]
+    return ModuleSelection(
+        full_build=False,
+        reason=f"{len(changed)} changed module(s), {len(dependents)} dependent(s)",
+        changed=sorted(changed),
+        dependents=sorted(dependents),
+        upstream=sorted(upstream),
+        skipped=skipped,
+        ignored_files=ignored,
+        projects=[modules[rel]["id"] for rel in sorted(changed)]
+    )
+
+class PhaseSplitter:
+    """Assigns streamed Maven log lines to the compile, test and build steps
+
+    Each plugin execution header ("--- compiler:3.11.0:compile (...) @ app ---")
+    switches the current step. Goals not listed in PIPELINE_GOAL_STEPS stay
+    with their module's current step, except that anything after a module's
+    tests counts as build.
+    """
+
+    def __init__(self):
+        self.sections: Dict[MavenStep, List[str]] = {step: [] for step in PIPELINE_STEPS}
+        self.current = MavenStep.COMPILE
+        self.module_steps: Dict[str, MavenStep] = {}
+        self.tested: set = set()
+        self.failed_step: Optional[MavenStep] = None
+
+    def _step_for(self, execution: str, module: str) -> MavenStep:
+        goal = execution.rsplit(":", 1)[-1]
+        step = PIPELINE_GOAL_STEPS.get(goal)
+        if step is None:
+            step = MavenStep.BUILD if module in self.tested else self.module_steps.get(module, MavenStep.COMPILE)
+        if goal == "test":
+            self.tested.add(module)
+        return step
+
+    async def feed(self, stream: str, line: str):
+        if stream == "stdout":
+            header = _EXECUTION_HEADER.match(line)
+            if header:
+                self.current = self._step_for(header.group(1), header.group(2))
+                self.module_steps[header.group(2)] = self.current
+            elif self.failed_step is None:
+                failed = _FAILED_GOAL.match(line)
+                if failed:
+                    # Failures outside a plugin (e.g. dependency resolution) belong to the current step
+                    self.failed_step = (PIPELINE_GOAL_STEPS.get(failed.group(1).rsplit(":", 1)[-1], self.current)
+                                        if failed.group(1) else self.current)
+        self.sections[self.current].append(line)
+
+def pipeline_response(request: PipelineRequest, overall: MavenResponse, splitter: PhaseSplitter) -> PipelineResponse:
+    """Build the per-step MavenResponses of a pipeline run from its split output"""
+    steps = PIPELINE_PHASES[request.phase]
+    failed = None if overall.success else (splitter.failed_step or splitter.current)
+    responses = {}
+    for step in steps:
+        spec = MAVEN_GOALS[step]
+        output = "".join(splitter.sections[step])
+        if failed is not None and PIPELINE_STEPS.index(step) > PIPELINE_STEPS.index(failed):
+            responses[step.value] = MavenResponse(
+                success=False,
+                message=f"{spec['failure']}: not run because the {failed.value} step failed"
+            )
+            continue
+
+        extra = {}
+        if step == MavenStep.TEST:
+            extra["test_results"] = overall.test_results or parse_test_results(output)
+        if step == failed:
+            response = MavenResponse(success=False, message=spec["failure"], output=output,
+                                     errors=overall.errors, **extra)
+        else:
+            if step == MavenStep.BUILD:
+                extra["build_artifacts"] = find_build_artifacts(request.project_path)
+            response = MavenResponse(success=True, message=spec["success"], output=output, **extra)
+        responses[step.value] = spill_output(step, request, response)
+
+    return PipelineResponse(
+        success=overall.success,
+        message=overall.message,
+        phase=request.phase,
+        **responses
+    )
+
+def pipeline_maven_request(request: PipelineRequest) -> MavenRequest:
+    goals = (["clean"] if request.clean else []) + [request.phase]
+    # The split relies on live output, which a cached result would not replay
+    return MavenRequest(**request.model_dump(exclude={"phase", "clean", "goals", "use_cache"}), goals=goals, use_cache=False)
+
+def cancelled_response(step: MavenStep) -> MavenResponse:
+    return MavenResponse(success=False, message=f"{MAVEN_GOALS[step]['failure']}: job cancelled")
+
+class MavenJob:
+    """A queued or running Maven step"""
+
+    def __init__(self, step: MavenStep, request: MavenRequest, priority: int, on_output: Optional[OutputCallback] = None):
+        self.id = uuid.uuid4().hex
+        self.step = step
+        self.request = request
+        self.priority = priority
+        self.sequence = 0
+        self.on_output = on_output
+        self.status = JobStatus.QUEUED
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[MavenResponse] = None
+        self.task: Optional[asyncio.Task] = None
+        self.done = asyncio.get_running_loop().create_future()
+
+    def finish(self, status: JobStatus, result: MavenResponse):
+        self.status = status
+        self.result = result
+        self.finished_at = time.time()
+        if not self.done.done():
+            self.done.set_result(result)
+
+    def info(self, queue_position: Optional[int] = None) -> JobInfo:
+        return JobInfo(
+            id=self.id,
+            step=self.step,
+            project_path=self.request.project_path,
+            status=self.status,
+            priority=self.priority,
+            submitted_at=self.submitted_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            queue_position=queue_position,
+            result=self.result
+        )
+
+class JobQueue:
+    """Runs Maven jobs with at most max_concurrent JVMs at a time
+
+    Waiting jobs are started highest priority first, in submission order
+    within a priority. Finished jobs are kept for polling until there are
+    more than retention of them.
+    """
+
+    def __init__(self, max_concurrent: int, retention: int):
+        self.max_concurrent = max_concurrent
+        self.retention = retention
+        self.jobs: Dict[str, MavenJob] = {}
+        self.waiting: List[Tuple[int, int, MavenJob]] = []
+        self.running = 0
+        self.counter = itertools.count()
+
+    def submit(self, step: MavenStep, request: MavenRequest, priority: int = 0,
+               on_output: Optional[OutputCallback] = None) -> MavenJob:
+        job = MavenJob(step, request, priority, on_output)
+        job.sequence = next(self.counter)
+        self.jobs[job.id] = job
+        heapq.heappush(self.waiting, (-priority, job.sequence, job))
+        self._dispatch()
+        return job
+
+    def queue_position(self, job: MavenJob) -> Optional[int]:
+        if job.status != JobStatus.QUEUED:
+            return None
+        key = (-job.priority, job.sequence)
+        return sum(1 for priority, sequence, other in self.waiting
+                   if other.status == JobStatus.QUEUED and (priority, sequence) < key)
+
+    def _dispatch(self):
+        while self.running < self.max_concurrent and self.waiting:
+            _, _, job = heapq.heappop(self.waiting)
+            if job.status != JobStatus.QUEUED:
+                continue
+            self.running += 1
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+            job.task = asyncio.create_task(self._run(job))
+            # A done callback also fires for tasks cancelled before they started running
+            job.task.add_done_callback(lambda _, job=job: self._release(job))
+
+    async def _run(self, job: MavenJob):
+        result = await execute_maven(job.step, job.request, job.on_output)
+        job.finish(JobStatus.SUCCEEDED if result.success else JobStatus.FAILED, result)
+
+    def _release(self, job: MavenJob):
+        if job.finished_at is None:
+            job.finish(JobStatus.CANCELLED, cancelled_response(job.step))
+        self.running -= 1
+        self._dispatch()
+        self._prune()
+
+    def cancel(self, job: MavenJob) -> bool:
+        """Cancel a queued job, or kill a running one; finished jobs are left alone"""
+        if job.status == JobStatus.QUEUED:
+            job.finish(JobStatus.CANCELLED, cancelled_response(job.step))
+            self._prune()
+            return True
+        if job.status == JobStatus.RUNNING:
+            job.task.cancel()
+            return True
+        return False
+
+    def _prune(self):
+        finished = [job for job in self.jobs.values() if job.finished_at is not None]
+        for job in sorted(finished, key=lambda job: job.finished_at)[:max(0, len(finished) - self.retention)]:
+            del self.jobs[job.id]
+
+jobs = JobQueue(MAVEN_MAX_CONCURRENT_BUILDS, MAVEN_JOB_RETENTION)
+
+async def run_job(step: MavenStep, request: MavenRequest, on_output: Optional[OutputCallback] = None) -> MavenResponse:
+    """Run a step through the job queue and wait for it, cancelling the job if the caller goes away"""
+    job = jobs.submit(step, request, on_output=on_output)
+    try:
+        return await asyncio.shield(job.done)
+    except asyncio.CancelledError:
+        jobs.cancel(job)
+        raise
+
+async def stream_maven(step: MavenStep, request: MavenRequest, observer: Optional[OutputCallback] = None,
+                       finish: Optional[Callable[[MavenResponse], Awaitable[BaseModel]]] = None):
+    """Yield a job event, NDJSON output events while Maven runs, then a final result event
+
+    observer also sees every output line, and the finish coroutine turns the
+    job's MavenResponse into the result sent. If the client disconnects the
+    generator is closed and the job is cancelled.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_output(stream: str, line: str):
+        if observer is not None:
+            await observer(stream, line)
+        queue.put_nowait({"event": "output", "stream": stream, "line": line.rstrip("\r\n")})
+
+    job = jobs.submit(step, request, on_output=on_output)
+    job.done.add_done_callback(lambda _: queue.put_nowait(None))
+    try:
+        yield json.dumps({
+            "event": "job",
+            "job_id": job.id,
+            "status": job.status.value,
+            "queue_position": jobs.queue_position(job)
+        }) + "\n"
+        while True:
+            event = await queue.get()
+            if event is None:
+                break
+            yield json.dumps(event) + "\n"
+        result = await finish(job.result) if finish is not None else job.result
+        yield json.dumps({"event": "result", "result": result.model_dump()}) + "\n"
+    finally:
+        if job.finished_at is None:
+            jobs.cancel(job)
+
+async def execute_sharded_tests(request: ShardedTestRequest) -> MavenResponse:
+    """Compile the tests once, then run slices of the test classes through the job queue in parallel
+
+    Each shard runs the test phase with -Dtest set to its classes in its
+    own copy of the project, so modules resolve their reactor siblings'
+    classes and no two Surefire runs share a target directory. Reports
+    from all shards are copied back and merged into one test_results,
+    with per-shard details under "shards".
+    """
+    spec = MAVEN_GOALS[MavenStep.TEST]
+    base = request.model_dump(exclude={"shards", "goals", "use_cache"})
+    history = await collect_test_reports(request.project_path)
+    timings = {stats["name"]: stats["time"] for stats in history["classes"]} if history else {}
+    classes = await run_in_threadpool(find_test_classes, request.project_path)
+    if not classes:
+        return await run_job(MavenStep.TEST, MavenRequest(**base))
+    shards = partition_tests(classes, timings, request.shards or MAVEN_TEST_SHARDS)
+
+    compiled = await run_job(MavenStep.TEST_SHARD, MavenRequest(**base, goals=["test-compile"], use_cache=False))
+    if not compiled.success:
+        return compiled.model_copy(update={"message": f"{spec['failure']}: test compilation failed"})
+
+    # Copies are not prefetched projects themselves, so they get the original's repository settings
+    repository, offline = repository_settings(request, ["test"])
+
+    def shard_request(copy_dir: str, shard_classes: List[str]) -> MavenRequest:
+        properties = {
+            **(request.properties or {}),
+            "test": ",".join(shard_classes),
+            # Modules holding none of the shard's classes must not fail the run
+            "surefire.failIfNoSpecifiedTests": "false",
+            "failIfNoTests": "false"
+        }
+        return MavenRequest(
+            **{**base, "project_path": copy_dir, "properties": properties,
+               "local_repository": repository, "offline": offline},
+            goals=["test"],
+            use_cache=False
+        )
+
+    copies = [tempfile.mkdtemp(prefix="maven-shard-") for _ in shards]
+    try:
+        await asyncio.gather(*[run_in_threadpool(copy_project, request.project_path, copy_dir) for copy_dir in copies])
+        started = time.time() - 1
+        results = await asyncio.gather(*[
+            run_job(MavenStep.TEST_SHARD, shard_request(copy_dir, shard_classes))
+            for copy_dir, (_, shard_classes) in zip(copies, shards)
+        ])
+        for copy_dir in copies:
+            await run_in_threadpool(copy_shard_reports, copy_dir, request.project_path, started)
+    finally:
+        for copy_dir in copies:
+            await run_in_threadpool(shutil.rmtree, copy_dir, True)
+
+    success = all(result.success for result in results)
+    outputs = [f"[shard {index}]\n{result.output or ''}" for index, result in enumerate(results)]
+
+    test_results = await collect_test_reports(request.project_path, since=started)
+    if test_results is None:
+        test_results = parse_test_results("".join(result.output or "" for result in results))
+    test_results["shards"] = [
+        {"shard": index, "classes": len(shard_classes), "estimated_time": estimate, "success": result.success}
+        for index, ((estimate, shard_classes), result) in enumerate(zip(shards, results))
+    ]
+    return MavenResponse(
+        success=success,
+        message=spec["success"] if success else spec["failure"],
+        output="".join(outputs),
+        errors=[error for result in results for error in (result.errors or [])] or None,
+        test_results=test_results
+    )
+
+@app.post("/compile", response_model=MavenResponse)
+async def compile_project(request: MavenRequest):
+    """Compile the Maven project"""
+    return await run_job(MavenStep.COMPILE, request)
+
 @app.post("/test", response_model=MavenResponse)
 async def run_tests(request: MavenRequest):
     """Run Maven tests"""
-    try:
-        cmd = ["mvn", "test"]
-        if request.profiles:
-            cmd.extend(["-P", ",".join(request.profiles)])
-        if request.properties:
-            for key, value in request.properties.items():
-                cmd.append(f"-D{key}={value}")
-        
-        result = subprocess.run(cmd, cwd=request.project_path, capture_output=True, text=True)
-        test_results = parse_test_results(result.stdout)
-        
-        if result.returncode == 0:
+    return await run_job(MavenStep.TEST, request)
+
+@app.post("/test/sharded", response_model=MavenResponse)
+async def run_tests_sharded(request: ShardedTestRequest):
+    """Run tests as concurrent Surefire runs over timing-balanced slices of the test classes"""
+    if request.shards is not None and request.shards < 1:
+        raise HTTPException(status_code=400, detail="shards must be at least 1")
+    return await execute_sharded_tests(request)
+
+@app.post("/test/impacted", response_model=MavenResponse)
+async def run_impacted_tests(request: ImpactedTestRequest):
+    """Run only the test classes that reference the changed classes, directly or transitively"""
+    if request.full_suite:
+        selection = TestSelection(
+            full_suite=True, reason="full suite requested", changed_classes=[], tests=[], ignored_files=[]
+        )
+    else:
+        try:
+            if not os.path.isfile(os.path.join(request.project_path, "pom.xml")):
+                raise HTTPException(status_code=404, detail="pom.xml not found")
+
+            selection = await run_in_threadpool(select_tests, request.project_path, request.changed_files)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    maven_request = MavenRequest(**request.model_dump(exclude={"changed_files", "full_suite"}))
+    if not selection.full_suite:
+        if not selection.tests:
             return MavenResponse(
                 success=True,
-                message="Tests completed successfully",
-                output=result.stdout,
-                test_results=test_results
+                message="No tests impacted by the changed files",
+                test_selection=selection
             )
-        else:
-            return MavenResponse(
-                success=False,
-                message="Tests failed",
-                errors=[result.stderr],
-                test_results=test_results
-            )
-    except Exception as e:
-        return MavenResponse(
-            success=False,
-            message=f"Tests failed: {str(e)}",
-            errors=[str(e)]
-        )
+        maven_request = maven_request.model_copy(update={"properties": {
+            **(request.properties or {}),
+            "test": ",".join(selection.tests),
+            "surefire.failIfNoSpecifiedTests": "false",
+            "failIfNoTests": "false"
+        }})
+
+    response = await run_job(MavenStep.TEST, maven_request)
+    return response.model_copy(update={"test_selection": selection})
 
 @app.post("/build", response_model=MavenResponse)
 async def build_project(request: MavenRequest):
     """Build the Maven project"""
+    return await run_job(MavenStep.BUILD, request)
+
+@app.post("/build/selective", response_model=MavenResponse)
+async def build_selective(request: SelectiveBuildRequest):
+    """Build only the modules owning the changed files plus their dependents (-pl -amd -T)"""
     try:
-        cmd = ["mvn", "clean", "install"]
-        if request.skip_tests:
-            cmd.append("-DskipTests")
-        if request.profiles:
-            cmd.extend(["-P", ",".join(request.profiles)])
-        if request.properties:
-            for key, value in request.properties.items():
-                cmd.append(f"-D{key}={value}")
-        
-        result = subprocess.run(cmd, cwd=request.project_path, capture_output=True, text=True)
-        
-        # Find build artifacts
-        target_dir = os.path.join(request.project_path, "target")
-        artifacts = []
-        if os.path.exists(target_dir):
-            for file in os.listdir(target_dir):
-                if file.endswith(".jar") or file.endswith(".war"):
-                    artifacts.append(os.path.join("target", file))
-        
-        if result.returncode == 0:
+        if not os.path.isfile(os.path.join(request.project_path, "pom.xml")):
+            raise HTTPException(status_code=404, detail="pom.xml not found")
+
+        selection = await run_in_threadpool(
+            select_modules, request.project_path, request.changed_files, request.also_make
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    maven_request = MavenRequest(**request.model_dump(exclude={"changed_files", "step", "also_make"}))
+    if not selection.full_build:
+        if not selection.projects:
             return MavenResponse(
                 success=True,
-                message="Build completed successfully",
-                output=result.stdout,
-                build_artifacts=artifacts
-            )
-        else:
-            return MavenResponse(
-                success=False,
-                message="Build failed",
-                errors=[result.stderr]
+                message="No modules affected by the changed files",
+                module_selection=selection
             )
+        maven_request = maven_request.model_copy(update={
+            "projects": selection.projects,
+            "also_make": request.also_make,
+            "also_make_dependents": True
+        })
+    if not maven_request.threads:
+        maven_request = maven_request.model_copy(update={"threads": MAVEN_BUILD_THREADS})
+
+    response = await run_job(request.step, maven_request)
+    return response.model_copy(update={"module_selection": selection})
+
+@app.post("/pipeline", response_model=PipelineResponse)
+async def run_pipeline(request: PipelineRequest):
+    """Run one Maven invocation up to a phase and report compile, test and build results separately"""
+    if request.phase not in PIPELINE_PHASES:
+        raise HTTPException(status_code=400, detail=f"Unsupported phase: {request.phase}")
+
+    splitter = PhaseSplitter()
+    overall = await run_job(MavenStep.PIPELINE, pipeline_maven_request(request), on_output=splitter.feed)
+    return await run_in_threadpool(pipeline_response, request, overall, splitter)
+
+@app.post("/pipeline/stream")
+async def run_pipeline_stream(request: PipelineRequest):
+    """Run the pipeline, streaming log lines and the final PipelineResponse as NDJSON"""
+    if request.phase not in PIPELINE_PHASES:
+        raise HTTPException(status_code=400, detail=f"Unsupported phase: {request.phase}")
+
+    splitter = PhaseSplitter()
+    return StreamingResponse(
+        stream_maven(
+            MavenStep.PIPELINE,
+            pipeline_maven_request(request),
+            observer=splitter.feed,
+            finish=lambda overall: run_in_threadpool(pipeline_response, request, overall, splitter)
+        ),
+        media_type="application/x-ndjson"
+    )
+
+@app.post("/compile/stream")
+async def compile_project_stream(request: MavenRequest):
+    """Compile the Maven project, streaming log lines and the final MavenResponse as NDJSON"""
+    return StreamingResponse(stream_maven(MavenStep.COMPILE, request), media_type="application/x-ndjson")
+
+@app.post("/test/stream")
+async def run_tests_stream(request: MavenRequest):
+    """Run Maven tests, streaming log lines and the final MavenResponse as NDJSON"""
+    return StreamingResponse(stream_maven(MavenStep.TEST, request), media_type="application/x-ndjson")
+
+@app.post("/build/stream")
+async def build_project_stream(request: MavenRequest):
+    """Build the Maven project, streaming log lines and the final MavenResponse as NDJSON"""
+    return StreamingResponse(stream_maven(MavenStep.BUILD, request), media_type="application/x-ndjson")
+
+def get_job(job_id: str) -> MavenJob:
+    job = jobs.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/jobs", response_model=JobInfo)
+async def submit_job(request: JobRequest):
+    """Queue a compile, test or build job and return its ID without waiting"""
+    job = jobs.submit(request.step, MavenRequest(**request.model_dump(exclude={"step", "priority"})), request.priority)
+    return job.info(jobs.queue_position(job))
+
+@app.get("/jobs", response_model=List[JobInfo])
+async def list_jobs():
+    """List queued, running and retained finished jobs (results omitted)"""
+    return [
+        job.info(jobs.queue_position(job)).model_copy(update={"result": None})
+        for job in jobs.jobs.values()
+    ]
+
+@app.get("/jobs/{job_id}", response_model=JobInfo)
+async def job_status(job_id: str):
+    """Poll a job's status, including its result once finished"""
+    job = get_job(job_id)
+    return job.info(jobs.queue_position(job))
+
+@app.get("/jobs/{job_id}/result", response_model=MavenResponse)
+async def job_result(job_id: str, wait: float = 0):
+    """Return a job's MavenResponse, waiting up to `wait` seconds for it to finish"""
+    job = get_job(job_id)
+    if wait > 0 and not job.done.done():
+        try:
+            await asyncio.wait_for(asyncio.shield(job.done), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+    if job.result is None:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+    return job.result
+
+@app.delete("/jobs/{job_id}", response_model=JobInfo)
+async def cancel_job(job_id: str):
+    """Cancel a queued job or kill a running job's Maven process tree"""
+    job = get_job(job_id)
+    if not jobs.cancel(job):
+        raise HTTPException(status_code=409, detail=f"Job already {job.status.value}")
+    if job.task is not None:
+        # Wait for the process tree to be killed so the reported status is final
+        await asyncio.wait([job.task])
+    return job.info()
+
+@app.post("/test-reports", response_model=Dict)
+async def test_reports(request: TestReportRequest):
+    """Aggregate Surefire/Failsafe XML reports across all modules"""
+    try:
+        if not os.path.isdir(request.project_path):
+            raise HTTPException(status_code=404, detail="Project directory not found")
+
+        results = await collect_test_reports(request.project_path, request.since)
+        if results is None:
+            raise HTTPException(status_code=404, detail="No test reports found")
+        return results
+
+    except HTTPException:
+        raise
     except Exception as e:
-        return MavenResponse(
-            success=False,
-            message=f"Build failed: {str(e)}",
-            errors=[str(e)]
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/artifacts/{artifact_id}", response_model=ArtifactInfo)
+async def artifact_info(artifact_id: str):
+    """Describe a stored Maven log"""
+    try:
+        return ArtifactInfo(**await run_in_threadpool(artifacts.info, artifact_id))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+@app.get("/artifacts/{artifact_id}/lines", response_model=ArtifactLines)
+async def artifact_lines(artifact_id: str, start: int = 0, count: int = 200):
+    """Read a range of lines (0-based) from a stored Maven log"""
+    try:
+        lines = await run_in_threadpool(
+            artifacts.read_lines, artifact_id, max(0, start), min(count, MAX_ARTIFACT_READ_LINES)
+        )
+        return ArtifactLines(start=max(0, start), lines=lines)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+@app.get("/artifacts/{artifact_id}/bytes")
+async def artifact_bytes(artifact_id: str, offset: int = 0, length: int = 65536):
+    """Read a byte range of the uncompressed Maven log"""
+    try:
+        data = await run_in_threadpool(
+            artifacts.read_bytes, artifact_id, max(0, offset), min(length, MAX_ARTIFACT_READ_BYTES)
         )
+        return Response(content=data, media_type="text/plain; charset=utf-8")
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+@app.get("/artifacts/{artifact_id}/search", response_model=ArtifactSearchResult)
+async def artifact_search(artifact_id: str, pattern: str, regex: bool = False, ignore_case: bool = False,
+                          max_matches: int = 100):
+    """Grep a stored Maven log, returning matching lines with their line numbers"""
+    try:
+        compiled = re.compile(pattern if regex else re.escape(pattern), re.IGNORECASE if ignore_case else 0)
+    except re.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pattern: {e}")
+    try:
+        matches, truncated = await run_in_threadpool(artifacts.search, artifact_id, compiled, max_matches)
+        return ArtifactSearchResult(matches=matches, truncated=truncated)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+async def mvnd_control(option: str) -> DaemonStatus:
+    if not (MAVEN_BACKEND == "mvnd" or mvnd_available()):
+        return DaemonStatus(backend="mvn", available=False)
+    returncode, stdout, stderr = await run_maven([MVND_EXECUTABLE, option], os.getcwd())
+    return DaemonStatus(backend="mvnd", available=returncode == 0, output=stdout + stderr)
+
+@app.post("/dependencies/prefetch", response_model=PrefetchResponse)
+async def prefetch(request: PrefetchRequest):
+    """Fill the shared local repository from a mirror directory so later builds can run offline"""
+    try:
+        mirror = request.mirror or MAVEN_MIRROR_DIR
+        if not mirror or not os.path.isdir(mirror):
+            raise HTTPException(status_code=400, detail="Mirror directory not found")
+        for project_path in request.project_paths:
+            if not os.path.isfile(os.path.join(project_path, "pom.xml")):
+                raise HTTPException(status_code=404, detail=f"pom.xml not found in {project_path}")
+
+        return await run_in_threadpool(
+            prefetch_dependencies,
+            request.project_paths,
+            mirror,
+            request.local_repository or MAVEN_SHARED_REPOSITORY
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/daemons", response_model=DaemonStatus)
+async def daemon_status():
+    """Report the execution backend and the warm mvnd daemons (mvnd --status)"""
+    try:
+        return await mvnd_control("--status")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/daemons/stop", response_model=DaemonStatus)
+async def stop_daemons():
+    """Stop all mvnd daemons; the next build starts a fresh one"""
+    try:
+        return await mvnd_control("--stop")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def find_spring_boot_version(pom_path: str) -> Optional[str]:
+    """Find the Spring Boot version from the starter parent or the spring-boot.version property"""
+    with open(pom_path, 'r') as f:
+        pom_content = f.read()
+    
+    # Look for Spring Boot version
+    parent_version_match = re.search(r'<parent>.*?<artifactId>spring-boot-starter-parent</artifactId>.*?<version>(.*?)</version>.*?</parent>', 
+                                   pom_content, re.DOTALL)
+    if parent_version_match:
+        return parent_version_match.group(1)
+    
+    # Look in properties
+    properties_match = re.search(r'<spring-boot.version>(.*?)</spring-boot.version>', pom_content)
+    if properties_match:
+        return properties_match.group(1)
+    return None
 
 @app.post("/verify-spring-boot", response_model=Dict)
 async def verify_spring_boot_version(request: MavenRequest):
@@ -170,20 +2203,9 @@ async def verify_spring_boot_version(request: MavenRequest):
         if not os.path.exists(pom_path):
             raise HTTPException(status_code=404, detail="pom.xml not found")
         
-        with open(pom_path, 'r') as f:
-            pom_content = f.read()
-        
-        # Look for Spring Boot version
-        spring_boot_version = None
-        parent_version_match = re.search(r'<parent>.*?<artifactId>spring-boot-starter-parent</artifactId>.*?<version>(.*?)</version>.*?</parent>', 
-                                       pom_content, re.DOTALL)
-        if parent_version_match:
-            spring_boot_version = parent_version_match.group(1)
-        else:
-            # Look in properties
-            properties_match = re.search(r'<spring-boot.version>(.*?)</spring-boot.version>', pom_content)
-            if properties_match:
-                spring_boot_version = properties_match.group(1)
+        spring_boot_version = cached_parse(
+            pom_path, "spring-boot-version", SPRING_BOOT_SCAN_VERSION, find_spring_boot_version
+        )
         
         if not spring_boot_version:
             return {
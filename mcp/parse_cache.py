@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+PARSE_CACHE_PATH = os.getenv(
+    "PARSE_CACHE_PATH", os.path.expanduser("~/.cache/migration-assistant/parse-cache.sqlite")
+)
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Rows kept in the (path, size, mtime) -> hash memo; whole source trees are hashed through it
+PARSE_CACHE_MAX_DIGESTS = int(os.getenv("PARSE_CACHE_MAX_DIGESTS", "200000"))
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def hash_file(file_path: str) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ParseCache:
+    """Content-addressed store of parser results shared by the MCP servers
+
+    Results are keyed by the file's content hash plus the parser name and
+    version, so identical files share one entry and a parser change
+    invalidates only its own results. A (path, size, mtime) -> hash table
+    avoids re-hashing files that have not been touched. When the stored
+    results grow past max_bytes the least recently used ones are evicted,
+    and the memo is trimmed to its most recently written max_digests rows.
+    """
+
+    def __init__(self, path: str = PARSE_CACHE_PATH, max_bytes: int = PARSE_CACHE_MAX_BYTES,
+                 max_digests: int = PARSE_CACHE_MAX_DIGESTS):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_digests = max_digests
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Autocommit with WAL lets several server processes share the file
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "digest TEXT, parser TEXT, version TEXT, value TEXT, size INTEGER, accessed REAL, "
+            "PRIMARY KEY (digest, parser, version))"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS digests ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT)"
+        )
+        self.total_bytes = self._stored_bytes()
+        # Upper bound on the memo's rows (replaced rows are counted twice); recounted before trimming
+        self.digest_rows = self.connection.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+
+    def _stored_bytes(self) -> int:
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def file_digest(self, file_path: str) -> str:
+        """Content hash of a file, reusing the stored hash while size and mtime are unchanged"""
+        stat = os.stat(file_path)
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT digest FROM digests WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (file_path, stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+        if row:
+            return row[0]
+
+        digest = hash_file(file_path)
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO digests (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                (file_path, stat.st_size, stat.st_mtime_ns, digest)
+            )
+            self.digest_rows += 1
+            if self.digest_rows > self.max_digests:
+                self._trim_digests()
+        return digest
+
+    def get_or_parse(self, file_path: str, parser: str, version: str, parse: Callable[[str], Any]) -> Any:
+        """Return the cached result of parse(file_path), parsing and storing it on a miss
+
+        Results must be JSON serializable. A file modified while it was being
+        parsed is not stored, since the result may not match the hashed content.
+        """
+        before = os.stat(file_path)
+        digest = self.file_digest(file_path)
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value FROM results WHERE digest = ? AND parser = ? AND version = ?",
+                (digest, parser, version)
+            ).fetchone()
+            if row:
+                self.hits += 1
+                self.connection.execute(
+                    "UPDATE results SET accessed = ? WHERE digest = ? AND parser = ? AND version = ?",
+                    (time.time(), digest, parser, version)
+                )
+                return json.loads(row[0])
+            self.misses += 1
+
+        value = parse(file_path)
+
+        after = os.stat(file_path)
+        if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+            return value
+
+        data = json.dumps(value)
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results (digest, parser, version, value, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, parser, version, data, len(data), time.time())
+            )
+            self.total_bytes += len(data)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+        return value
+
+    def _evict(self):
+        """Drop least recently used results until the store is back under 90% of its budget"""
+        # Other processes write to the same file, so re-read the real total first
+        self.total_bytes = self._stored_bytes()
+        target = int(self.max_bytes * 0.9)
+        if self.total_bytes <= target:
+            return
+        to_free = self.total_bytes - target
+        rowids = []
+        freed = 0
+        for rowid, size in self.connection.execute("SELECT rowid, size FROM results ORDER BY accessed"):
+            rowids.append(rowid)
+            freed += size
+            if freed >= to_free:
+                break
+        self.connection.executemany("DELETE FROM results WHERE rowid = ?", [(rowid,) for rowid in rowids])
+        self.total_bytes -= freed
+
+    def _trim_digests(self):
+        """Drop the least recently written memo rows until it is back under 90% of its limit"""
+        self.digest_rows = self.connection.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+        if self.digest_rows <= self.max_digests:
+            return
+        excess = self.digest_rows - int(self.max_digests * 0.9)
+        # INSERT OR REPLACE assigns a new rowid, so rowid order is write order
+        self.connection.execute(
+            "DELETE FROM digests WHERE rowid IN (SELECT rowid FROM digests ORDER BY rowid LIMIT ?)", (excess,)
+        )
+        self.digest_rows -= excess
+
+    def stats(self) -> dict:
+        with self.lock:
+            entries = self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            digests = self.connection.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+        return {
+            "entries": entries,
+            "bytes": self.total_bytes,
+            "digests": digests,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+_cache: Optional[ParseCache] = None
+_cache_pid: Optional[int] = None
+_cache_lock = threading.Lock()
+
+def get_parse_cache() -> ParseCache:
+    """Return this process's cache instance (SQLite connections must not cross a fork)"""
+    global _cache, _cache_pid
+    with _cache_lock:
+        if _cache is None or _cache_pid != os.getpid():
+            _cache = ParseCache()
+            _cache_pid = os.getpid()
+        return _cache
+
+def cached_parse(file_path: str, parser: str, version: str, parse: Callable[[str], Any]) -> Any:
+    """Parse through the shared cache, falling back to a direct parse if the cache is unusable"""
+    try:
+        cache = get_parse_cache()
+    except (OSError, sqlite3.Error):
+        return parse(file_path)
+    try:
+        return cache.get_or_parse(file_path, parser, version, parse)
+    except sqlite3.Error:
+        return parse(file_path)
+
+def file_digest(file_path: str) -> str:
+    """Content hash of a file using the shared stat memo, hashing directly if the cache is unusable"""
+    try:
+        return get_parse_cache().file_digest(file_path)
+    except (OSError, sqlite3.Error):
+        return hash_file(file_path)
@@ -0,0 +1,410 @@
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from mcp.parse_cache import cached_parse
+
+# Effective POM resolution, shared by the file parser and Maven servers
+LOCAL_REPOSITORY = os.getenv("MAVEN_LOCAL_REPOSITORY", os.path.expanduser("~/.m2/repository"))
+POM_CACHE_SIZE = 1024
+JAVA_VERSION_PROPERTIES = ["maven.compiler.release", "java.version", "maven.compiler.source"]
+_PROPERTY_REFERENCE = re.compile(r'\$\{([^}]+)\}')
+
+# Bump when parse_pom_model's output changes so stale entries in the parse cache are ignored
+POM_PARSER_VERSION = "3"
+
+def _local_name(tag: str) -> str:
+    """Strip the {namespace} prefix ElementTree puts on tags"""
+    return tag.rsplit('}', 1)[-1]
+
+def _pom_section() -> Dict:
+    """Parts of a POM that may appear both at project level and inside a <profile>"""
+    return {
+        "properties": {},
+        "dependencies": [],
+        "dependency_management": [],
+        "plugins": [],
+        "plugin_management": [],
+        "modules": []
+    }
+
+# Element paths, relative to <project> or <profile>, of the repeated items the parser keeps
+_POM_ITEM_LISTS = {
+    ("dependencies", "dependency"): "dependencies",
+    ("dependencyManagement", "dependencies", "dependency"): "dependency_management",
+    ("build", "plugins", "plugin"): "plugins",
+    ("build", "pluginManagement", "plugins", "plugin"): "plugin_management"
+}
+
+def _pom_dependency_item() -> Dict:
+    return {"groupId": "", "artifactId": "", "version": None, "scope": None, "type": None, "optional": None}
+
+def parse_pom_model(file_path: str) -> Dict:
+    """Stream a POM with iterparse, keeping only the sections needed for analysis
+
+    Each element is dropped from the tree as soon as it has been read, so
+    memory stays flat even for generated BOMs with thousands of managed
+    dependencies. Profiles are returned separately and not merged in.
+    Plugins carry the dependencies declared inside them.
+    """
+    model = {
+        "groupId": None,
+        "artifactId": None,
+        "version": None,
+        "packaging": "jar",
+        "parent": None,
+        "profiles": [],
+        **_pom_section()
+    }
+    path: List[str] = []
+    elements = []
+    # The project or the profile being read, the dependency/plugin/parent inside it
+    # and a dependency declared inside that plugin
+    section = model
+    item: Optional[Dict] = None
+    item_depth = 0
+    plugin_dependency: Optional[Dict] = None
+
+    for event, elem in ET.iterparse(file_path, events=("start", "end")):
+        if event == "start":
+            path.append(_local_name(elem.tag))
+            elements.append(elem)
+            rel = tuple(path[1:] if section is model else path[3:])
+            if path == ["project", "parent"]:
+                # An explicit empty <relativePath/> disables the filesystem lookup
+                item = {"groupId": None, "artifactId": None, "version": None, "relativePath": "../pom.xml"}
+                model["parent"] = item
+                item_depth = len(path)
+            elif path == ["project", "profiles", "profile"]:
+                section = {"id": "", "active_by_default": False, **_pom_section()}
+                model["profiles"].append(section)
+            elif item is None and rel in _POM_ITEM_LISTS:
+                if rel[-1] == "dependency":
+                    item = _pom_dependency_item()
+                else:
+                    item = {"groupId": "org.apache.maven.plugins", "artifactId": "", "version": None, "dependencies": []}
+                section[_POM_ITEM_LISTS[rel]].append(item)
+                item_depth = len(path)
+            elif (item is not None and "dependencies" in item and len(path) == item_depth + 2
+                    and path[-2:] == ["dependencies", "dependency"]):
+                plugin_dependency = _pom_dependency_item()
+                item["dependencies"].append(plugin_dependency)
+            continue
+
+        name = path[-1]
+        rel = tuple(path[1:] if section is model else path[3:])
+        text = (elem.text or "").strip()
+        if plugin_dependency is not None and len(path) == item_depth + 3 and name in plugin_dependency:
+            plugin_dependency[name] = text or plugin_dependency[name]
+        elif plugin_dependency is not None and len(path) == item_depth + 2:
+            plugin_dependency = None
+        elif item is not None and len(path) == item_depth + 1 and name in item and name != "dependencies":
+            item[name] = text if name == "relativePath" else (text or item[name])
+        elif item is not None and len(path) == item_depth:
+            item = None
+        elif len(rel) == 2 and rel[0] == "properties":
+            section["properties"][name] = text
+        elif rel == ("modules", "module"):
+            section["modules"].append(text)
+        elif section is model and len(rel) == 1 and name in ("groupId", "artifactId", "version", "packaging"):
+            model[name] = text or model[name]
+        elif section is not model and rel == ("id",):
+            section["id"] = text
+        elif section is not model and rel == ("activation", "activeByDefault"):
+            section["active_by_default"] = text == "true"
+        elif section is not model and not rel:
+            section = model
+
+        path.pop()
+        elements.pop()
+        elem.clear()
+        if elements:
+            elements[-1].remove(elem)
+
+    return model
+
+@lru_cache(maxsize=POM_CACHE_SIZE)
+def _load_pom_model(file_path: str, mtime_ns: int) -> Dict:
+    return cached_parse(file_path, "pom-model", POM_PARSER_VERSION, parse_pom_model)
+
+def load_pom_model(file_path: str) -> Dict:
+    """Load a POM model, memoized by path and mtime so shared parents are parsed once
+
+    The returned model is shared between callers and must not be modified.
+    """
+    return _load_pom_model(file_path, os.stat(file_path).st_mtime_ns)
+
+def interpolate(value: Optional[str], properties: Dict[str, str]) -> Optional[str]:
+    """Expand ${...} references, leaving unknown properties untouched"""
+    if not value or '${' not in value:
+        return value
+    # Bounded number of passes guards against self-referencing properties
+    for _ in range(10):
+        expanded = _PROPERTY_REFERENCE.sub(lambda m: properties.get(m.group(1), m.group(0)), value)
+        if expanded == value:
+            break
+        value = expanded
+    return value
+
+def repository_pom_path(local_repository: str, group_id: str, artifact_id: str, version: str) -> str:
+    """Location of an artifact's POM inside a Maven local repository"""
+    return os.path.join(
+        local_repository, *group_id.split('.'), artifact_id, version, f"{artifact_id}-{version}.pom"
+    )
+
+def resolve_parent_pom(file_path: str, parent: Dict, local_repository: str) -> Optional[str]:
+    """Find the parent POM through relativePath, then the local repository"""
+    if parent["relativePath"]:
+        candidate = os.path.normpath(os.path.join(os.path.dirname(file_path), parent["relativePath"]))
+        if os.path.isdir(candidate):
+            candidate = os.path.join(candidate, "pom.xml")
+        if os.path.isfile(candidate):
+            model = load_pom_model(candidate)
+            group_id = model["groupId"] or (model["parent"] or {}).get("groupId")
+            if group_id == parent["groupId"] and model["artifactId"] == parent["artifactId"]:
+                return candidate
+
+    if parent["groupId"] and parent["artifactId"] and parent["version"]:
+        candidate = repository_pom_path(local_repository, parent["groupId"], parent["artifactId"], parent["version"])
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+def repository_coordinate(local_repository: str, pom_path: str) -> Optional[str]:
+    """groupId:artifactId:version of a POM stored in a Maven repository, None if it lies elsewhere"""
+    rel = os.path.relpath(os.path.abspath(pom_path), os.path.abspath(local_repository))
+    parts = rel.split(os.sep)
+    if parts[0] == ".." or len(parts) < 4:
+        return None
+    return f"{'.'.join(parts[:-3])}:{parts[-3]}:{parts[-2]}"
+
+def pom_coordinate(item: Dict) -> str:
+    """groupId:artifactId:version of a model, dependency or plugin"""
+    return f"{item['groupId']}:{item['artifactId']}:{item['version'] or ''}"
+
+# Effective models of imported BOMs by (path, mtime, repository); BOMs are shared by most of a project's POMs
+_boms: Dict[Tuple[str, int, str], Dict] = {}
+_boms_lock = threading.Lock()
+_importing = threading.local()
+
+def effective_bom(file_path: str, local_repository: str) -> Optional[Dict]:
+    """Memoized effective_pom of an imported BOM, None for a BOM that imports itself back"""
+    key = (file_path, os.stat(file_path).st_mtime_ns, local_repository)
+    with _boms_lock:
+        if key in _boms:
+            return _boms[key]
+    active = _importing.__dict__.setdefault("paths", set())
+    if file_path in active:
+        return None
+    active.add(file_path)
+    try:
+        bom = effective_pom(file_path, local_repository)
+    finally:
+        active.discard(file_path)
+    with _boms_lock:
+        if len(_boms) >= POM_CACHE_SIZE:
+            _boms.clear()
+        _boms[key] = bom
+    return bom
+
+def effective_pom(file_path: str, local_repository: str) -> Dict:
+    """Resolve the parent chain, interpolate properties and apply dependency and plugin management
+
+    required_poms lists the parent and imported BOM POMs the result was
+    built from, and missing_poms the groupId:artifactId:version of those
+    that could not be found, so callers can tell whether it is complete.
+    """
+    chain = []
+    current = os.path.abspath(file_path)
+    unresolved_parent = None
+    while current and current not in chain:
+        chain.append(current)
+        parent = load_pom_model(current)["parent"]
+        if not parent:
+            break
+        resolved = resolve_parent_pom(current, parent, local_repository)
+        if resolved is None:
+            unresolved_parent = parent
+        current = resolved
+
+    models = [load_pom_model(path) for path in reversed(chain)]
+    child = models[-1]
+
+    # Inheritance: later (closer) POMs override earlier ones
+    properties = {}
+    group_id = version = None
+    for model in models:
+        properties.update(model["properties"])
+        group_id = model["groupId"] or (model["parent"] or {}).get("groupId") or group_id
+        version = model["version"] or (model["parent"] or {}).get("version") or version
+
+    properties.update({
+        "project.groupId": group_id or "",
+        "project.artifactId": child["artifactId"] or "",
+        "project.version": version or "",
+        "project.packaging": child["packaging"],
+        "project.basedir": os.path.dirname(chain[0])
+    })
+    if child["parent"]:
+        properties["project.parent.groupId"] = child["parent"]["groupId"] or ""
+        properties["project.parent.version"] = child["parent"]["version"] or ""
+    properties = {key: interpolate(value, properties) for key, value in properties.items()}
+
+    def expand(dep: Dict) -> Dict:
+        return {key: interpolate(value, properties) for key, value in dep.items()}
+
+    def expand_plugin(plugin: Dict) -> Dict:
+        return {**expand({**plugin, "dependencies": None}), "dependencies": list(map(expand, plugin["dependencies"]))}
+
+    # Coordinates may use properties (${project.groupId}), so entries are keyed after interpolation
+    managed = {}
+    dependencies = {}
+    managed_plugins = {}
+    plugins = {}
+    for model in models:
+        for dep in map(expand, model["dependency_management"]):
+            managed[(dep["groupId"], dep["artifactId"])] = dep
+        for dep in map(expand, model["dependencies"]):
+            dependencies[(dep["groupId"], dep["artifactId"])] = dep
+        for plugin in map(expand_plugin, model["plugin_management"]):
+            managed_plugins[(plugin["groupId"], plugin["artifactId"])] = plugin
+        for plugin in map(expand_plugin, model["plugins"]):
+            key = (plugin["groupId"], plugin["artifactId"])
+            inherited = plugins.get(key)
+            if inherited:
+                plugin["version"] = plugin["version"] or inherited["version"]
+                plugin["dependencies"] = inherited["dependencies"] + plugin["dependencies"]
+            plugins[key] = plugin
+
+    required_poms = chain[1:]
+    missing_poms = [pom_coordinate(unresolved_parent)] if unresolved_parent else []
+
+    # Imported BOMs contribute management entries that are not declared explicitly, first import winning
+    for dep in list(managed.values()):
+        if dep["scope"] != "import" or not dep["version"]:
+            continue
+        bom_path = repository_pom_path(local_repository, dep["groupId"], dep["artifactId"], dep["version"])
+        if not os.path.isfile(bom_path):
+            missing_poms.append(pom_coordinate(dep))
+            continue
+        bom = effective_bom(bom_path, local_repository)
+        if bom is None:
+            continue
+        required_poms += [bom_path] + bom["required_poms"]
+        missing_poms += bom["missing_poms"]
+        for bom_dep in bom["dependency_management"]:
+            managed.setdefault((bom_dep["groupId"], bom_dep["artifactId"]), bom_dep)
+
+    resolved_dependencies = []
+    for key, dep in dependencies.items():
+        managed_dep = managed.get(key)
+        if managed_dep:
+            dep["version"] = dep["version"] or managed_dep["version"]
+            dep["scope"] = dep["scope"] or managed_dep["scope"]
+        resolved_dependencies.append(dep)
+
+    resolved_plugins = []
+    for key, plugin in plugins.items():
+        managed_plugin = managed_plugins.get(key)
+        if managed_plugin:
+            plugin["version"] = plugin["version"] or managed_plugin["version"]
+            plugin["dependencies"] = managed_plugin["dependencies"] + plugin["dependencies"]
+        resolved_plugins.append(plugin)
+
+    java_version = None
+    for key in JAVA_VERSION_PROPERTIES:
+        if properties.get(key):
+            java_version = properties[key]
+            break
+
+    return {
+        "groupId": group_id,
+        "artifactId": child["artifactId"],
+        "version": version,
+        "packaging": child["packaging"],
+        "java_version": java_version,
+        "properties": properties,
+        "dependencies": resolved_dependencies,
+        "dependency_management": list(managed.values()),
+        "plugins": resolved_plugins,
+        "plugin_management": list(managed_plugins.values()),
+        "parent_chain": chain,
+        "unresolved_parent": unresolved_parent,
+        "required_poms": list(dict.fromkeys(required_poms)),
+        "missing_poms": list(dict.fromkeys(missing_poms))
+    }
+
+def module_pom_path(pom_path: str, module: str) -> str:
+    """Resolve a <module> entry to its POM file"""
+    candidate = os.path.normpath(os.path.join(os.path.dirname(pom_path), module))
+    return os.path.join(candidate, "pom.xml") if os.path.isdir(candidate) else candidate
+
+def topological_levels(dependencies: Dict[str, List[str]]) -> List[List[str]]:
+    """Group nodes into levels where each level only depends on earlier levels"""
+    remaining = {node: set(deps) for node, deps in dependencies.items()}
+    levels = []
+    while remaining:
+        level = sorted(node for node, deps in remaining.items() if not deps)
+        if not level:
+            raise ValueError(f"The projects in the reactor contain a cyclic reference: {sorted(remaining)}")
+        levels.append(level)
+        for node in level:
+            del remaining[node]
+        for deps in remaining.values():
+            deps.difference_update(level)
+    return levels
+
+def reactor_modules(project_path: str, local_repository: str, workers: Optional[int] = None) -> List[Dict]:
+    """Discover all reactor modules, resolving each level of <modules> concurrently
+
+    Each module is a dict with id (groupId:artifactId after interpolation),
+    path relative to the root, pom_path, packaging, version, the ids of its
+    <modules> and the in-reactor ids it depends_on. Dependencies, imported
+    BOMs and the parent all count as edges.
+    """
+    root_pom = project_path if os.path.isfile(project_path) else os.path.join(project_path, "pom.xml")
+    root_dir = os.path.dirname(os.path.abspath(root_pom))
+    effective = {}
+    frontier = [os.path.abspath(root_pom)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while frontier:
+            models = executor.map(lambda path: (path, effective_pom(path, local_repository)), frontier)
+            next_frontier = []
+            for pom_path, model in models:
+                effective[pom_path] = model
+                for module in load_pom_model(pom_path)["modules"]:
+                    child = module_pom_path(pom_path, module)
+                    if os.path.isfile(child) and child not in effective and child not in next_frontier:
+                        next_frontier.append(child)
+            frontier = next_frontier
+
+    ids = {pom_path: f"{model['groupId']}:{model['artifactId']}" for pom_path, model in effective.items()}
+    reactor_ids = set(ids.values())
+
+    modules = []
+    for pom_path, model in effective.items():
+        module_id = ids[pom_path]
+        raw = load_pom_model(pom_path)
+        depends_on = set()
+        for dep in model["dependencies"]:
+            depends_on.add(f"{dep['groupId']}:{dep['artifactId']}")
+        for dep in model["dependency_management"]:
+            if dep["scope"] == "import":
+                depends_on.add(f"{dep['groupId']}:{dep['artifactId']}")
+        if raw["parent"]:
+            depends_on.add(f"{raw['parent']['groupId']}:{raw['parent']['artifactId']}")
+
+        children = [module_pom_path(pom_path, module) for module in raw["modules"]]
+        modules.append({
+            "id": module_id,
+            "path": os.path.relpath(os.path.dirname(pom_path), root_dir),
+            "pom_path": pom_path,
+            "packaging": raw["packaging"],
+            "version": model["version"],
+            "modules": [ids[child] for child in children if child in ids],
+            "depends_on": sorted((depends_on & reactor_ids) - {module_id})
+        })
+    return modules